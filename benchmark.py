@@ -0,0 +1,277 @@
+from argparse import ArgumentParser
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from json import dumps, loads
+from os import makedirs, path as os_path
+from random import random, uniform
+from subprocess import Popen, PIPE
+from sys import executable
+from time import perf_counter, process_time, sleep
+from hashlib import sha1
+import tracemalloc
+
+from pyboxd.session import Session
+from pyboxd.limiter import AdaptiveLimiter
+from pyboxd.instrument import instrumentation, ProfileAggregator
+
+
+LETTERBOXD_URL = 'https://letterboxd.com'
+# instrumentation phases that make up parsing, 'fetch' is the network side
+PARSE_PHASES = ('parse', 'serialize', 'extract')
+
+
+class RecordingSession(Session):
+    # fetches from the live site and writes every 200 body into the fixture directory
+
+    def __init__(self, fixtures:str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.fixtures: str = fixtures
+        makedirs(fixtures, exist_ok=True)
+        manifest = os_path.join(fixtures, 'manifest.json')
+        self.manifest: dict = loads(open(manifest).read()) if os_path.exists(manifest) else {}
+
+    def fetch(self, url:str, **kwargs):
+        response = super().fetch(url, **kwargs)
+        if response.status_code == 200:
+            path = url[len(LETTERBOXD_URL):]
+            name = sha1(path.encode()).hexdigest() + '.html'
+            with open(os_path.join(self.fixtures, name), 'wb') as file:
+                file.write(response.content)
+            with self.lock:
+                self.manifest[path] = name
+        return response
+
+    def save_manifest(self) -> None:
+        with open(os_path.join(self.fixtures, 'manifest.json'), 'w') as file:
+            file.write(dumps(self.manifest, indent=1, sort_keys=True))
+
+
+class LocalSession(Session):
+    # same client stack, pointed at the local fixture server
+
+    def __init__(self, base_url:str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.baseUrl: str = base_url
+
+    def fetch(self, url:str, **kwargs):
+        return super().fetch(url.replace(LETTERBOXD_URL, self.baseUrl, 1), **kwargs)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+
+    fixtures: str = 'fixtures'
+    manifest: dict = {}
+    latency: float = 0.05
+    jitter: float = 0.02
+    throttleRate: float = 0.0
+
+    def do_GET(self) -> None:
+        sleep(max(0.0, self.latency + uniform(-self.jitter, self.jitter)))
+        if self.throttleRate and random() < self.throttleRate:
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        name = self.manifest.get(self.path)
+        if name is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        with open(os_path.join(self.fixtures, name), 'rb') as file:
+            body = file.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def serve(fixtures:str, port:int=8765, latency:float=0.05, jitter:float=0.02, throttle_rate:float=0.0) -> None:
+    FixtureHandler.fixtures = fixtures
+    FixtureHandler.manifest = loads(open(os_path.join(fixtures, 'manifest.json')).read())
+    FixtureHandler.latency = latency
+    FixtureHandler.jitter = jitter
+    FixtureHandler.throttleRate = throttle_rate
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    print(f'Serving {len(FixtureHandler.manifest)} fixtures on http://127.0.0.1:{port}', flush=True)
+    server.serve_forever()
+
+
+def entry_points(username:str, film_name:str, review_pages:int) -> list:
+    from pyboxd.user import PyBoxd
+    from pyboxd.film import Film
+
+    def profile():
+        user = PyBoxd.user()
+        user.set_username(username)
+        user.get_profile_stats()
+        user.get_user_bio()
+        user.get_user_image()
+
+    def user_with(method:str):
+        def run():
+            user = PyBoxd.user()
+            user.username = username
+            getattr(user, method)()
+        return run
+
+    def diary():
+        user = PyBoxd.user()
+        user.username = username
+        PyBoxd.user_diary(user).get_user_diary()
+
+    def film():
+        Film().set_film_name(film_name)
+
+    def film_stats():
+        Film.scrape_film_stats(film_name=film_name)
+
+    def film_reviews():
+        Film.FilmReview(film_name).get_film_reviews(pages=review_pages)
+
+    return [
+        ('profile', profile),
+        ('watched_films', user_with('get_user_watched_films')),
+        ('watchlist', user_with('get_user_watchlist')),
+        ('network', user_with('get_user_network')),
+        ('diary', diary),
+        ('film', film),
+        ('film_stats', film_stats),
+        ('film_reviews', film_reviews)
+    ]
+
+
+def use_session(session:Session) -> None:
+    from pyboxd.user import PyBoxd
+    from pyboxd.film import Film
+    PyBoxd.session = session
+    Film.session = session
+
+
+def record(fixtures:str, username:str, film_name:str, review_pages:int=3) -> None:
+    session = RecordingSession(fixtures, rate=2.0)
+    use_session(session)
+    for name, function in entry_points(username, film_name, review_pages):
+        print(f'Recording {name}...', flush=True)
+        function()
+    session.save_manifest()
+    print(f'Recorded {len(session.manifest)} pages into {fixtures}')
+
+
+def percentile(values:list, fraction:float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def measure(name:str, function, session:Session) -> dict:
+    # parse_seconds sums the parse, serialize and extract spans (wall time spent inside them, across threads);
+    # process_cpu_seconds is everything the process burned, requests/urllib3 and thread scheduling included
+    profile = ProfileAggregator()
+    session.reset_stats()
+    instrumentation.add_hook(profile)
+    wall, cpu = perf_counter(), process_time()
+    try:
+        function()
+    finally:
+        wall, cpu = perf_counter() - wall, process_time() - cpu
+        instrumentation.remove_hook(profile)
+    stats = session.stats()
+    latencies = list(session.latencies)
+    # tracemalloc slows every allocation down, so peak memory comes from a second, untimed run
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    parse_ns = sum(total for (phase, _), (_, total, _, _) in profile.phases.items() if phase in PARSE_PHASES)
+    return {
+        "entry_point": name,
+        "requests": stats["requests"],
+        "seconds": wall.__round__(3),
+        "pages_per_second": (stats["requests"] / wall).__round__(2) if wall else 0.0,
+        "p50_ms": (percentile(latencies, 0.50) * 1000).__round__(1),
+        "p99_ms": (percentile(latencies, 0.99) * 1000).__round__(1),
+        "parse_seconds": (parse_ns / 1e9).__round__(3),
+        "process_cpu_seconds": cpu.__round__(3),
+        "peak_mb": (peak / 1024 / 1024).__round__(2)
+    }
+
+
+def run(fixtures:str, username:str, film_name:str, review_pages:int=3, port:int=8765, latency:float=0.05, jitter:float=0.02, throttle_rate:float=0.0, repeat:int=1, rate:float=0.0, warmup:bool=True) -> list:
+    # the server runs in its own process so its CPU time is not counted against the scraper
+    server = Popen([executable, __file__, 'serve', '--fixtures', fixtures, '--port', str(port), '--latency', str(latency),
+                    '--jitter', str(jitter), '--throttle-rate', str(throttle_rate)], stdout=PIPE, text=True)
+    try:
+        server.stdout.readline()
+        # same adaptive limiter configuration as the default session
+        session = LocalSession(f'http://127.0.0.1:{port}', rate=rate, backoff=0.1, limiter=AdaptiveLimiter())
+        use_session(session)
+        functions = entry_points(username, film_name, review_pages)
+        if warmup:
+            # untimed pass: lazy imports, connection pool and the server's page cache are all warm afterwards
+            for _, function in functions:
+                function()
+        results = []
+        for name, function in functions:
+            for _ in range(repeat):
+                results.append(measure(name, function, session))
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def print_results(results:list) -> None:
+    columns = ["entry_point", "requests", "seconds", "pages_per_second", "p50_ms", "p99_ms", "parse_seconds", "process_cpu_seconds", "peak_mb"]
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    print('  '.join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print('  '.join(str(result[column]).ljust(width) for column, width in zip(columns, widths)))
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Offline PyBoxd benchmarks against recorded Letterboxd pages.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help='fetch live pages and store them as fixtures')
+    serve_parser = commands.add_parser('serve', help='serve recorded fixtures over local HTTP')
+    run_parser = commands.add_parser('run', help='benchmark every entry point against the fixture server')
+
+    for command in (record_parser, serve_parser, run_parser):
+        command.add_argument('--fixtures', default='fixtures')
+    for command in (record_parser, run_parser):
+        command.add_argument('--username', required=True)
+        command.add_argument('--film', required=True)
+        command.add_argument('--review-pages', type=int, default=3)
+    for command in (serve_parser, run_parser):
+        command.add_argument('--port', type=int, default=8765)
+        command.add_argument('--latency', type=float, default=0.05)
+        command.add_argument('--jitter', type=float, default=0.02)
+        command.add_argument('--throttle-rate', type=float, default=0.0)
+    run_parser.add_argument('--repeat', type=int, default=1)
+    run_parser.add_argument('--rate', type=float, default=0.0, help='client token-bucket rate, 0 disables it')
+    run_parser.add_argument('--no-warmup', action='store_true', help='time the first, cold run of every entry point too')
+    run_parser.add_argument('--json', action='store_true', help='print raw results as JSON')
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.fixtures, args.username, args.film, args.review_pages)
+    elif args.command == 'serve':
+        serve(args.fixtures, args.port, args.latency, args.jitter, args.throttle_rate)
+    else:
+        results = run(args.fixtures, args.username, args.film, args.review_pages, args.port, args.latency, args.jitter, args.throttle_rate, args.repeat, args.rate, not args.no_warmup)
+        if args.json:
+            print(dumps(results, indent=1))
+        else:
+            print_results(results)
+
+
+if __name__ == '__main__':
+    main()
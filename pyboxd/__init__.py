@@ -0,0 +1,49 @@
+"""PyBoxd, a Letterboxd scraper. Submodules are imported on first use of a name below."""
+
+from importlib import import_module
+
+EXPORTS = {
+    'PyBoxd': 'user',
+    'Film': 'film',
+    'FIELDS': 'film',
+    'Session': 'session',
+    'TokenBucket': 'session',
+    'default_session': 'session',
+    'AdaptiveLimiter': 'limiter',
+    'default_limiter': 'limiter',
+    'ResponseCache': 'cache',
+    'Crawler': 'crawl',
+    'default_crawler': 'crawl',
+    'iter_ordered': 'crawl',
+    'aiter_ordered': 'crawl',
+    'SoupParser': 'parsers',
+    'FastParser': 'parsers',
+    'PARSERS': 'parsers',
+    'instrumentation': 'instrument',
+    'ProfileAggregator': 'instrument',
+    'OpenTelemetryHook': 'instrument',
+    'Pipeline': 'pipeline',
+    'DiaryFrame': 'frame',
+    'FilmMatrix': 'analytics',
+    'FilmStore': 'filmstore',
+    'JobQueue': 'jobs',
+    'GridSnapshot': 'changes',
+    'NDJSONSink': 'export',
+    'ParquetSink': 'export',
+    'GraphCrawler': 'graph',
+}
+
+__all__ = sorted(EXPORTS)
+
+
+def __getattr__(name:str):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(EXPORTS))
@@ -0,0 +1,139 @@
+import numpy as np
+from .frame import DiaryFrame
+
+
+# rating histogram buckets as Letterboxd labels them, half a star (1) to five stars (10)
+STAR_BUCKETS = ('½', '★', '★½', '★★', '★★½', '★★★', '★★★½', '★★★★', '★★★★½', '★★★★★')
+STAT_COLUMNS = ('members', 'fans', 'likes', 'reviews', 'lists')
+BUCKET_VALUES = np.arange(1, 11, dtype=np.float64)
+
+
+def weighted_mean(histograms:np.ndarray) -> np.ndarray:
+    # per row mean rating in half stars (1-10), 0 for rows without ratings
+    histograms = np.atleast_2d(histograms)
+    totals = histograms.sum(axis=1)
+    sums = histograms @ BUCKET_VALUES
+    return np.divide(sums, totals, out=np.zeros(len(histograms)), where=totals > 0)
+
+
+def weighted_variance(histograms:np.ndarray) -> np.ndarray:
+    histograms = np.atleast_2d(histograms)
+    totals = histograms.sum(axis=1)
+    squares = np.divide(histograms @ (BUCKET_VALUES ** 2), totals, out=np.zeros(len(histograms)), where=totals > 0)
+    return np.maximum(squares - weighted_mean(histograms) ** 2, 0.0)
+
+
+def bayesian_scores(histograms:np.ndarray, prior:float=None, weight:float=None) -> np.ndarray:
+    # mean shrunk towards `prior` as if every film had `weight` extra ratings at the prior.
+    # defaults: prior is the mean over every rating, weight the median ratings count of rated films
+    histograms = np.atleast_2d(histograms)
+    totals = histograms.sum(axis=1).astype(np.float64)
+    sums = histograms @ BUCKET_VALUES
+    if prior is None:
+        prior = sums.sum() / totals.sum() if totals.sum() else 0.0
+    if weight is None:
+        rated = totals[totals > 0]
+        weight = float(np.median(rated)) if len(rated) else 1.0
+    return (weight * prior + sums) / (weight + totals)
+
+
+class FilmMatrix:
+    """Rating histograms (films x 10 buckets) and popularity counts (films x 5) for a batch of films."""
+
+    def __init__(self, slugs:list, histograms:np.ndarray, stats:np.ndarray) -> None:
+        self.slugs: list = slugs
+        self.histograms: np.ndarray = histograms
+        # columns follow STAT_COLUMNS, -1 where a film's stats were never scraped
+        self.stats: np.ndarray = stats
+
+    def __str__(self) -> str:
+        return f'Films: {len(self.slugs)}\nRatings: {int(self.histograms.sum())}\nBytes: {self.histograms.nbytes + self.stats.nbytes}'
+
+    def __len__(self) -> int:
+        return len(self.slugs)
+
+    def totals(self) -> np.ndarray:
+        return self.histograms.sum(axis=1)
+
+    def means(self) -> np.ndarray:
+        return weighted_mean(self.histograms)
+
+    def variances(self) -> np.ndarray:
+        return weighted_variance(self.histograms)
+
+    def scores(self, prior:float=None, weight:float=None) -> np.ndarray:
+        return bayesian_scores(self.histograms, prior=prior, weight=weight)
+
+    def distribution(self) -> np.ndarray:
+        # share of every bucket per film, rows sum to 1 (or 0 without ratings)
+        totals = self.totals()[:, None]
+        return np.divide(self.histograms, totals, out=np.zeros(self.histograms.shape), where=totals > 0)
+
+    def popularity(self, column:str='members') -> np.ndarray:
+        return self.stats[:, STAT_COLUMNS.index(column)]
+
+    def top(self, n:int=10, values:np.ndarray=None) -> list:
+        # [(slug, value)] for the n highest values, Bayesian scores by default
+        values = self.scores() if values is None else values
+        n = min(n, len(values))
+        best = np.argpartition(-values, n - 1)[:n] if n else np.array([], dtype=np.int64)
+        best = best[np.argsort(-values[best], kind='stable')]
+        return [(self.slugs[i], float(values[i])) for i in best]
+
+    @staticmethod
+    def from_ratings(slugs:list, ratings:list, stats:list=None) -> 'FilmMatrix':
+        # ratings: Film.filmRating dicts, stats: Film.filmStats dicts; either may be empty
+        histograms = np.array([[rating.get(star, 0) for star in STAR_BUCKETS] for rating in ratings], dtype=np.int64).reshape(len(slugs), 10)
+        stats = stats or [None] * len(slugs)
+        stats = np.array([[stat.get(column, -1) for column in STAT_COLUMNS] if stat else [-1] * 5 for stat in stats], dtype=np.int64).reshape(len(slugs), 5)
+        return FilmMatrix(list(slugs), histograms, stats)
+
+    @staticmethod
+    def from_films(films:list) -> 'FilmMatrix':
+        return FilmMatrix.from_ratings([film.filmName for film in films], [film.filmRating for film in films], [film.filmStats for film in films])
+
+    @staticmethod
+    def from_store(store) -> 'FilmMatrix':
+        # every film in a FilmStore that has a stored rating histogram
+        rows = list(store.iter_ratings())
+        return FilmMatrix.from_ratings([row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows])
+
+
+def rating_distribution(frame:DiaryFrame) -> np.ndarray:
+    # count of diary entries per half-star bucket, unrated entries left out
+    return np.bincount(frame.ratings[frame.rated].astype(np.int64) - 1, minlength=10)
+
+
+def rating_distributions(frames:list) -> tuple:
+    # (users, users x 10 matrix) in one bincount over every diary at once
+    users = [frame.user for frame in frames]
+    if not frames:
+        return users, np.zeros((0, 10), dtype=np.int64)
+    owners = np.repeat(np.arange(len(frames)), [frame.length for frame in frames])
+    ratings = np.concatenate([frame.ratings for frame in frames]).astype(np.int64)
+    rated = np.concatenate([frame.rated for frame in frames])
+    keys = owners[rated] * 10 + ratings[rated] - 1
+    return users, np.bincount(keys, minlength=len(frames) * 10).reshape(len(frames), 10)
+
+
+def watch_counts(frame:DiaryFrame, by:str='month') -> tuple:
+    # (periods, counts) for every year or month from the first entry to the last, gaps included
+    users, periods, counts = watch_count_matrix([frame], by=by)
+    return periods, counts[0]
+
+
+def watch_count_matrix(frames:list, by:str='month') -> tuple:
+    # (users, periods, users x periods matrix) on one shared calendar axis
+    if by not in ('month', 'year'):
+        raise ValueError(f'Unknown period: {by}')
+    unit = 'datetime64[M]' if by == 'month' else 'datetime64[Y]'
+    users = [frame.user for frame in frames]
+    dates = np.concatenate([frame.dates for frame in frames]).astype(unit) if frames else np.array([], dtype=unit)
+    if len(dates) == 0:
+        return users, dates, np.zeros((len(frames), 0), dtype=np.int64)
+    first, last = dates.min(), dates.max()
+    width = int((last - first).astype(np.int64)) + 1
+    owners = np.repeat(np.arange(len(frames)), [frame.length for frame in frames])
+    keys = owners * width + (dates - first).astype(np.int64)
+    counts = np.bincount(keys, minlength=len(frames) * width).reshape(len(frames), width)
+    return users, np.arange(first, last + 1), counts
@@ -0,0 +1,182 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import sqlite3
+from zlib import compress, decompress
+from json import dumps, loads
+from re import compile
+from threading import Lock
+from time import time
+from .lazy import lazy_module
+
+if TYPE_CHECKING:
+    from requests import Response
+
+requests = lazy_module('requests')
+
+
+# first matching pattern wins, TTL in seconds
+DEFAULT_TTLS = [
+    (compile(r'/films/diary/(page/1/)?$'), 15 * 60),
+    (compile(r'/(films|watchlist|following|followers)/(page/1/)?$'), 30 * 60),
+    (compile(r'/(films/diary|films|watchlist|following|followers)/page/\d+/$'), 6 * 3600),
+    (compile(r'/csi/film/[^/]+/rating-histogram/$'), 24 * 3600),
+    (compile(r'/film/[^/]+/(members|reviews)/'), 24 * 3600),
+    (compile(r'/film/[^/]+/$'), 7 * 24 * 3600),
+]
+# a paginated list, group 1 is the list itself and group 2 the page number (None for the bare list url)
+LIST_PAGE_PATTERN = compile(r'^(.*/(?:films/diary|films|watchlist|following|followers)/)(?:page/(\d+)/)?$')
+# access times are written in batches instead of once per hit
+ACCESS_BATCH = 256
+
+
+class ResponseCache:
+
+    def __init__(self, path:str='pyboxd_cache.sqlite', max_bytes:int=512 * 1024 * 1024, ttls:list=None, default_ttl:int=3600) -> None:
+        self.path: str = path
+        self.maxBytes: int = max_bytes
+        self.ttls: list = DEFAULT_TTLS if ttls is None else ttls
+        self.defaultTtl: int = default_ttl
+        self.lock: Lock = Lock()
+        self.connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'url TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB, size INTEGER, '
+            'etag TEXT, last_modified TEXT, stored_at REAL, accessed_at REAL)'
+        )
+        self.connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self.connection.commit()
+        self.totalBytes: int = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self.hits: int = 0
+        self.misses: int = 0
+        self.revalidated: int = 0
+        self.evictions: int = 0
+        self.accessed: dict = {}
+
+    def __str__(self) -> str:
+        stats = self.stats()
+        return f'Hits: {stats["hits"]}\nMisses: {stats["misses"]}\nRevalidated: {stats["revalidated"]}\nEvictions: {stats["evictions"]}\nEntries: {stats["entries"]}\nBytes: {stats["bytes"]}'
+
+    def ttl_for(self, url:str) -> int:
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.defaultTtl
+
+    def lookup(self, url:str) -> tuple:
+        # returns (response, fresh), or (None, False) when nothing is stored
+        with self.lock:
+            row = self.connection.execute('SELECT status, headers, body, stored_at FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, False
+            self.accessed[url] = time()
+            if len(self.accessed) >= ACCESS_BATCH:
+                self._write_accessed()
+            fresh = time() - row[3] < self.ttl_for(url)
+            # stale entries count as misses even if a 304 later saves the download
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return ResponseCache.build_response(url, row[0], loads(row[1]), decompress(row[2])), fresh
+
+    def validators(self, response:Response) -> dict:
+        headers = {}
+        if response.headers.get('ETag'):
+            headers['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = response.headers['Last-Modified']
+        return headers
+
+    def store(self, url:str, response:Response) -> None:
+        if response.status_code != 200:
+            return
+        body = compress(response.content)
+        now = time()
+        with self.lock:
+            old = self.connection.execute('SELECT size, body FROM responses WHERE url = ?', (url,)).fetchone()
+            self.totalBytes += len(body) - (old[0] if old else 0)
+            if old is not None and old[1] != body:
+                self._expire_later_pages(url)
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, response.status_code, dumps(dict(response.headers)), body, len(body),
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now)
+            )
+            self.connection.commit()
+            self.accessed.pop(url, None)
+            self._evict()
+
+    def touch(self, url:str) -> None:
+        # a 304 means the stored body is still good, restart its TTL
+        with self.lock:
+            self.revalidated += 1
+            self.connection.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?', (time(), time(), url))
+            self.connection.commit()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.connection.execute('DELETE FROM responses')
+            self.connection.commit()
+            self.totalBytes = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries = self.connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": self.totalBytes
+            }
+
+    def close(self) -> None:
+        with self.lock:
+            self._write_accessed()
+            self.connection.close()
+
+    def _write_accessed(self) -> None:
+        if not self.accessed:
+            return
+        self.connection.executemany('UPDATE responses SET accessed_at = ? WHERE url = ?', [(at, url) for url, at in self.accessed.items()])
+        self.connection.commit()
+        self.accessed = {}
+
+    def _expire_later_pages(self, url:str) -> None:
+        # one new entry on page 1 shifts every later page by one, so stored later pages would no longer
+        # line up with it. They are marked stale rather than deleted so they can still be revalidated
+        match = LIST_PAGE_PATTERN.search(url)
+        if match is None or match.group(2) not in (None, '1'):
+            return
+        pages = match.group(1) + 'page/'
+        self.connection.execute(
+            'UPDATE responses SET stored_at = 0 WHERE substr(url, 1, ?) = ? AND url != ?', (len(pages), pages, pages + '1/')
+        )
+
+    def _evict(self) -> None:
+        if self.totalBytes <= self.maxBytes:
+            return
+        self._write_accessed()
+        # drop least recently used rows until we are under the limit
+        for url, size in self.connection.execute('SELECT url, size FROM responses ORDER BY accessed_at').fetchall():
+            if self.totalBytes <= self.maxBytes:
+                break
+            self.connection.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self.totalBytes -= size
+            self.evictions += 1
+        self.connection.commit()
+
+    @staticmethod
+    def build_response(url:str, status:int, headers:dict, content:bytes) -> Response:
+        response = requests.Response()
+        response.url = url
+        response.status_code = status
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        # bodies are stored decoded, so drop any transfer encoding header
+        response.headers.pop('Content-Encoding', None)
+        response._content = content
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or 'utf-8'
+        return response
@@ -0,0 +1,158 @@
+from hashlib import blake2b
+from json import dumps, loads
+from random import randrange
+from .user import PyBoxd
+
+
+def fingerprint(slugs:list) -> str:
+    return blake2b('\n'.join(slugs).encode(), digest_size=8).hexdigest()
+
+
+def fetch_grid_page(user:str, page_type:str, i:int) -> tuple:
+    # (slugs, last page); unlike process_page a failed page raises instead of reading as empty
+    response = PyBoxd.session.get(f'https://letterboxd.com/{user}/{page_type}/page/{i}/')
+    response.raise_for_status()
+    last_page = PyBoxd.parser.last_page(response.text, page_type) if i == 1 else None
+    return PyBoxd.parser.film_slugs(response.text, endpoint = page_type, page = i), last_page
+
+
+class GridSnapshot:
+    """Ordered slugs of one film grid plus a fingerprint per page, enough to diff the next poll."""
+
+    def __init__(self, user:str, page_type:str, slugs:list, page_size:int) -> None:
+        self.user: str = user
+        self.pageType: str = page_type
+        self.slugs: list = slugs
+        self.pageSize: int = page_size
+        self.fingerprints: list = [fingerprint(slugs[i:i + page_size]) for i in range(0, len(slugs), page_size)] or [fingerprint([])]
+
+    def __str__(self) -> str:
+        return f'Username: {self.user}\nList: {self.pageType}\nFilms: {len(self.slugs)}\nPages: {self.last_page}'
+
+    @property
+    def last_page(self) -> int:
+        return len(self.fingerprints)
+
+    def to_dict(self) -> dict:
+        return {"user": self.user, "page_type": self.pageType, "page_size": self.pageSize, "film_slugs": self.slugs}
+
+    def save(self, path:str) -> None:
+        with open(path, 'w') as file:
+            file.write(dumps(self.to_dict()))
+
+    @staticmethod
+    def from_dict(data:dict) -> 'GridSnapshot':
+        return GridSnapshot(data["user"], data["page_type"], data["film_slugs"], data["page_size"])
+
+    @staticmethod
+    def load(path:str) -> 'GridSnapshot':
+        with open(path) as file:
+            return GridSnapshot.from_dict(loads(file.read()))
+
+
+def diff_film_grid(user:str, page_type:str='films', snapshot:GridSnapshot=None, full:bool=False) -> tuple:
+    """Returns (events, new snapshot, pages fetched).
+
+    Events are {"type": "add" | "remove", "film_slug", "position"}, positions in the new list for adds and the old one
+    for removals. Grids list the newest film first, so additions land at the front and a removal shifts every later
+    film up by one. A film's offset (new position - old position) therefore only changes where something was removed,
+    and pages between two fetched pages with the same offset can be rebuilt from the snapshot without fetching them.
+
+    Before a span of pages is rebuilt, one page of it chosen at random is fetched and compared with the snapshot, and
+    any mismatch falls back to a full crawl. An edit that keeps the count and the offsets, such as one film in the
+    middle swapped for another, is only caught when its page is the one checked, so it can go unnoticed for a few
+    polls. Pass full=True now and then to fetch every page and reconcile the snapshot.
+    """
+    if full or snapshot is None or not snapshot.slugs:
+        return full_diff(user, page_type, snapshot)
+
+    fetched = {}
+
+    def page(i:int) -> list:
+        if i not in fetched:
+            fetched[i] = fetch_grid_page(user, page_type, i)[0]
+        return fetched[i]
+
+    def fall_back() -> tuple:
+        events, new_snapshot, pages = full_diff(user, page_type, snapshot)
+        return events, new_snapshot, pages + len(fetched)
+
+    first, last_page = fetch_grid_page(user, page_type, 1)
+    fetched[1] = first
+    if last_page == snapshot.last_page and fingerprint(first) == snapshot.fingerprints[0]:
+        if fingerprint(page(last_page)) == snapshot.fingerprints[-1]:
+            if last_page <= 2:
+                return [], snapshot, len(fetched)
+            probe = randrange(2, last_page)
+            if fingerprint(page(probe)) == snapshot.fingerprints[probe - 1]:
+                return [], snapshot, len(fetched)
+            return fall_back()
+
+    size = len(first) if last_page > 1 else max(len(first), snapshot.pageSize)
+    old_index = {slug: i for i, slug in enumerate(snapshot.slugs)}
+
+    def offset(i:int) -> float:
+        # offset of the last film on page i that was already known, nan if none was
+        slugs = page(i)
+        for j in range(len(slugs) - 1, -1, -1):
+            position = old_index.get(slugs[j])
+            if position is not None:
+                return (i - 1) * size + j - position
+        return float('nan')
+
+    def rebuilt(i:int, shift:float) -> list:
+        start = (i - 1) * size - int(shift)
+        return snapshot.slugs[start:start + size]
+
+    offsets = {1: offset(1), last_page: offset(last_page)}
+
+    def bisect(a:int, b:int) -> None:
+        if b - a <= 1 or offsets[a] == offsets[b]:
+            return
+        middle = (a + b) // 2
+        offsets[middle] = offset(middle)
+        bisect(a, middle)
+        bisect(middle, b)
+
+    bisect(1, last_page)
+
+    # spot check every span that is about to be rebuilt from the snapshot
+    known = sorted(offsets)
+    for a, b in zip(known, known[1:]):
+        if b - a > 1:
+            probe = randrange(a + 1, b)
+            if page(probe) != rebuilt(probe, offsets[a]):
+                return fall_back()
+
+    slugs = []
+    shift = offsets[1]
+    for i in range(1, last_page + 1):
+        if i in fetched:
+            slugs.extend(fetched[i])
+            shift = offsets.get(i, shift)
+        else:
+            slugs.extend(rebuilt(i, shift))
+
+    # the rebuilt list has to line up with the real page count, otherwise the ordering assumption did not hold
+    expected = (last_page - 1) * size + len(page(last_page))
+    if len(slugs) != expected or len(set(slugs)) != len(slugs):
+        return fall_back()
+
+    new_snapshot = GridSnapshot(user, page_type, slugs, size)
+    return grid_events(snapshot.slugs, slugs), new_snapshot, len(fetched)
+
+
+def full_diff(user:str, page_type:str, snapshot:GridSnapshot=None) -> tuple:
+    first, last_page = fetch_grid_page(user, page_type, 1)
+    slugs = list(first)
+    for i in range(2, last_page + 1):
+        slugs.extend(fetch_grid_page(user, page_type, i)[0])
+    new_snapshot = GridSnapshot(user, page_type, slugs, len(first) if last_page > 1 else max(len(first), 1))
+    return grid_events(snapshot.slugs if snapshot else [], slugs), new_snapshot, last_page
+
+
+def grid_events(old:list, new:list) -> list:
+    old_set, new_set = set(old), set(new)
+    events = [{"type": "remove", "film_slug": slug, "position": i} for i, slug in enumerate(old) if slug not in new_set]
+    events.extend({"type": "add", "film_slug": slug, "position": i} for i, slug in enumerate(new) if slug not in old_set)
+    return events
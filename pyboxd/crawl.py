@@ -0,0 +1,87 @@
+from __future__ import annotations
+from collections import deque
+from itertools import islice
+from .session import Session, default_session
+from .lazy import lazy_module
+
+asyncio = lazy_module('asyncio')
+futures = lazy_module('concurrent.futures')
+
+
+class Crawler:
+
+    def __init__(self, concurrency:int=16, session:Session=None) -> None:
+        self.concurrency: int = concurrency
+        self.session: Session = session
+        # one small pool shared by every coroutine, sized to the semaphore so
+        # crawling hundreds of users never means hundreds of threads; created on first fetch
+        self.executor: futures.ThreadPoolExecutor = None
+        self.loop: asyncio.AbstractEventLoop = None
+        self.semaphore: asyncio.Semaphore = None
+
+    def __str__(self) -> str:
+        return f'Concurrency: {self.concurrency}'
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self.semaphore
+
+    def _get_executor(self) -> futures.ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = futures.ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='pyboxd-crawl')
+        return self.executor
+
+    async def fetch(self, url:str, session:Session=None) -> str:
+        session = session or self.session or default_session
+        async with self._get_semaphore():
+            response = await asyncio.get_running_loop().run_in_executor(self.executor or self._get_executor(), session.get, url)
+        response.raise_for_status()
+        return response.text
+
+    async def fetch_many(self, urls:list, session:Session=None) -> list:
+        # results come back in the same order as `urls`
+        return await asyncio.gather(*[self.fetch(url, session=session) for url in urls])
+
+    def run(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+
+def iter_ordered(function, items, prefetch:int=8):
+    # keeps up to `prefetch` calls in flight but yields results strictly in input order
+    items = iter(items)
+    executor = futures.ThreadPoolExecutor(max_workers=prefetch)
+    pending = deque(executor.submit(function, item) for item in islice(items, prefetch))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            for item in islice(items, 1):
+                pending.append(executor.submit(function, item))
+            yield result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_ordered(function, items, prefetch:int=8):
+    # async counterpart of iter_ordered, `function` returns a coroutine
+    items = iter(items)
+    pending = deque(asyncio.ensure_future(function(item)) for item in islice(items, prefetch))
+    try:
+        while pending:
+            result = await pending.popleft()
+            for item in islice(items, 1):
+                pending.append(asyncio.ensure_future(function(item)))
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+default_crawler = Crawler()
@@ -0,0 +1,184 @@
+import gzip
+from json import dumps
+from os import makedirs, getpid, remove, replace, path as os_path
+from threading import Lock
+from time import time
+from collections import OrderedDict
+
+
+# column types for ParquetSink, names of pyarrow type factories
+DIARY_COLUMNS = {"user": "string", "date": "string", "film_slug": "string", "rating": "int8", "like": "bool_", "rewatch": "bool_", "review": "string"}
+FILM_GRID_COLUMNS = {"user": "string", "list": "string", "position": "int32", "film_slug": "string"}
+NETWORK_COLUMNS = {"user": "string", "direction": "string", "other": "string"}
+REVIEW_COLUMNS = {"film": "string", "username": "string", "review_text": "string", "rating": "string", "date": "string", "review_id": "string"}
+
+
+class Sink:
+    """Buffers rows and writes them out in batches, one open file per partition.
+
+    At most `batch_size` rows are held in memory across all partitions. Files are written
+    under a hidden temporary name and renamed into place once complete, after `max_rows`
+    rows or on close, so readers never see a half-written file. Leaving a `with` block on an
+    exception calls abort() instead, which deletes the unfinished files.
+    """
+
+    extension = ''
+
+    def __init__(self, directory:str, partition_by:tuple=(), batch_size:int=10000, max_rows:int=1000000, max_open:int=64) -> None:
+        self.directory: str = directory
+        self.partitionBy: tuple = (partition_by,) if isinstance(partition_by, str) else tuple(partition_by)
+        self.batchSize: int = batch_size
+        self.maxRows: int = max_rows
+        self.maxOpen: int = max_open
+        self.lock: Lock = Lock()
+        self.buffers: dict = {}
+        self.buffered: int = 0
+        # partition -> [handle, temporary path, final path, rows written], least recently used first
+        self.files: OrderedDict = OrderedDict()
+        self.prefix: str = f'part-{int(time() * 1000)}-{getpid()}'
+        self.sequence: int = 0
+        self.rowsWritten: int = 0
+        self.filesWritten: list = []
+
+    def __enter__(self) -> 'Sink':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        # a crawl that raised must not leave files that look complete
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __str__(self) -> str:
+        return f'Directory: {self.directory}\nRows: {self.rowsWritten}\nFiles: {len(self.filesWritten)}\nBuffered: {self.buffered}'
+
+    def write(self, row:dict) -> None:
+        with self.lock:
+            partition = tuple(str(row.get(column)) for column in self.partitionBy)
+            self.buffers.setdefault(partition, []).append(row)
+            self.buffered += 1
+            if self.buffered >= self.batchSize:
+                self._flush()
+
+    def write_many(self, rows) -> int:
+        count = 0
+        for row in rows:
+            self.write(row)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        with self.lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self.lock:
+            self._flush()
+            while self.files:
+                self._finish(next(iter(self.files)))
+
+    def abort(self) -> None:
+        # drops buffered rows and every file still being written; files already rotated into place are kept
+        with self.lock:
+            self.buffers = {}
+            self.buffered = 0
+            while self.files:
+                handle, temporary, _, _ = self.files.popitem(last=False)[1]
+                try:
+                    self._close(handle)
+                except Exception:
+                    pass
+                if os_path.exists(temporary):
+                    remove(temporary)
+
+    def _flush(self) -> None:
+        for partition, rows in self.buffers.items():
+            entry = self.files.get(partition)
+            if entry is None:
+                entry = self._start(partition)
+            else:
+                self.files.move_to_end(partition)
+            self._write_batch(entry, rows)
+            entry[3] += len(rows)
+            self.rowsWritten += len(rows)
+            if entry[3] >= self.maxRows:
+                self._finish(partition)
+        self.buffers = {}
+        self.buffered = 0
+
+    def _start(self, partition:tuple) -> list:
+        if len(self.files) >= self.maxOpen:
+            self._finish(next(iter(self.files)))
+        # hive-style directories, e.g. user=someone/
+        directory = os_path.join(self.directory, *(f'{column}={value.replace("/", "_")}' for column, value in zip(self.partitionBy, partition)))
+        makedirs(directory, exist_ok=True)
+        name = f'{self.prefix}-{self.sequence:05d}{self.extension}'
+        self.sequence += 1
+        temporary = os_path.join(directory, '.' + name + '.tmp')
+        entry = self.files[partition] = [self._open(temporary), temporary, os_path.join(directory, name), 0]
+        return entry
+
+    def _finish(self, partition:tuple) -> None:
+        handle, temporary, final, _ = self.files.pop(partition)
+        self._close(handle)
+        replace(temporary, final)
+        self.filesWritten.append(final)
+
+    def _open(self, path:str):
+        raise NotImplementedError
+
+    def _write_batch(self, entry:list, rows:list) -> None:
+        raise NotImplementedError
+
+    def _close(self, handle) -> None:
+        handle.close()
+
+
+class NDJSONSink(Sink):
+    """Gzip-compressed newline-delimited JSON, one line per row."""
+
+    extension = '.ndjson.gz'
+
+    def __init__(self, directory:str, compresslevel:int=6, **kwargs) -> None:
+        super().__init__(directory, **kwargs)
+        self.compresslevel: int = compresslevel
+
+    def _open(self, path:str):
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=self.compresslevel)
+
+    def _write_batch(self, entry:list, rows:list) -> None:
+        entry[0].write(''.join(dumps(row, ensure_ascii=False, default=str) + '\n' for row in rows))
+
+
+class ParquetSink(Sink):
+    """Parquet files, one row group per flushed batch; needs pyarrow."""
+
+    extension = '.parquet'
+
+    def __init__(self, directory:str, columns:dict=None, compression:str='zstd', **kwargs) -> None:
+        super().__init__(directory, **kwargs)
+        import pyarrow as pa
+        self.pa = pa
+        self.compression: str = compression
+        # without `columns` the schema comes from the first batch, all-null columns become strings
+        self.schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in columns.items()]) if columns else None
+
+    def _open(self, path:str):
+        # the writer needs a schema, so it is only created with the first batch
+        return [path, None]
+
+    def _write_batch(self, entry:list, rows:list) -> None:
+        pa = self.pa
+        if self.schema is None:
+            inferred = pa.Table.from_pylist(rows).schema
+            self.schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in inferred])
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        handle = entry[0]
+        if handle[1] is None:
+            import pyarrow.parquet as pq
+            handle[1] = pq.ParquetWriter(handle[0], self.schema, compression=self.compression)
+        handle[1].write_table(table, row_group_size=len(rows))
+
+    def _close(self, handle) -> None:
+        handle[1].close()
@@ -0,0 +1,318 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from re import findall, search
+from .session import Session, default_session, requests
+from .crawl import iter_ordered, futures
+from .parsers import SoupParser, FastParser, make_soup, default_parser
+from itertools import chain
+from datetime import date, datetime
+from .instrument import span
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+FIELDS = ('details', 'rating', 'stats')
+
+
+class Film:
+
+    session: Session = default_session
+    parser: FastParser = default_parser
+
+    __slots__ = (
+        'filmName', 'filmId', 'filmReleaseYear', 'filmDirectors', 'filmSynopsis', 'filmPoster', 'filmCast', 'filmCrew',
+        'filmDetails', 'filmGenres', 'filmReleases', 'filmDuration', 'filmStats', 'filmRating',
+        'filmMainResponse', 'filmMainSoup', 'filmAverageRating', 'filmAverageRatingOver5', 'keepRaw'
+    )
+
+    def __init__(self, keep_raw:bool=False) -> None:
+        self.filmName: str = ""
+        self.filmId: int = 0
+        self.filmReleaseYear: int = 0
+        self.filmDirectors: list = []
+        self.filmSynopsis: str = ""
+        self.filmPoster: str = ""
+        self.filmCast: dict = []
+        self.filmCrew: dict = {}
+        self.filmDetails: dict = {}
+        self.filmGenres: dict = {}
+        self.filmReleases: dict = {}
+        self.filmDuration: int = 0
+        self.filmStats: dict = {}
+        self.filmRating: dict = {}
+        # the main page and its soup are only kept with keep_raw=True
+        self.keepRaw: bool = keep_raw
+        self.filmMainResponse: str = None
+        self.filmMainSoup: BeautifulSoup = None
+        self.filmAverageRating: int = 0
+        self.filmAverageRatingOver5: int = 0
+
+
+    def __str__(self) -> str:
+        film_status = self.filmName
+        return str(film_status)
+    
+    def set_film_name(self, film_name:str) -> None:
+
+        try:
+
+            self.filmName = film_name
+            response = Film.session.get(f'https://letterboxd.com/film/{self.filmName}/')
+            response.raise_for_status()
+            self.filmMainResponse = response.text
+            self.filmMainSoup = make_soup(self.filmMainResponse, 'film')
+            self.get_film_data()
+            self.release_page()
+    
+            return
+        
+        except requests.exceptions.RequestException as e:
+
+            print(f"Failed to retrieve data: {e}")
+            return
+
+    def get_film_data(self) -> None:
+        self.get_film_details()
+
+        self.get_film_rating()
+
+    def get_film_page(self) -> None:
+        response = Film.session.get(f'https://letterboxd.com/film/{self.filmName}/')
+        response.raise_for_status()
+        self.filmMainResponse = response.text
+        self.filmMainSoup = make_soup(self.filmMainResponse, 'film')
+        self.get_film_details()
+        self.release_page()
+
+    def release_page(self) -> None:
+        if not self.keepRaw:
+            self.filmMainResponse = None
+            self.filmMainSoup = None
+
+    def get_film_details(self) -> None:
+        with span('extract', endpoint='film'):
+            self.filmId = Film.scrape_film_id(soup = self.filmMainSoup)
+
+            self.filmReleaseYear = Film.scrape_film_release_year(soup = self.filmMainSoup)
+
+            self.filmDirectors = Film.scrape_film_directors(soup = self.filmMainSoup)
+
+            self.filmSynopsis = Film.scrape_film_synopsis(soup=self.filmMainSoup)
+
+            self.filmPoster = Film.scrape_film_poster(soup=self.filmMainSoup, film_name=self.filmName)
+
+    def get_film_rating(self) -> None:
+        self.filmRating = Film.scrape_average_rating(film_name=self.filmName)
+
+        self.filmAverageRating = Film.compute_average_rating(self.filmRating)
+        
+        self.filmAverageRatingOver5 = (self.filmAverageRating / 2).__round__(1)
+
+    def get_film_stats(self) -> None:
+
+        self.filmStats = Film.scrape_film_stats(film_name=self.filmName)
+
+    @staticmethod
+    def fetch_many(film_names:list, fields:tuple=FIELDS, max_workers:int=16) -> list:
+        # every sub-request of every film goes into one pool, so the main page, rating
+        # histogram and members page of many films are all in flight together
+        unknown = set(fields) - set(FIELD_LOADERS)
+        if unknown:
+            raise ValueError(f'Unknown film fields: {sorted(unknown)}')
+
+        films = []
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            for film_name in film_names:
+                film = Film()
+                film.filmName = film_name
+                films.append(film)
+                for field in fields:
+                    pending[executor.submit(FIELD_LOADERS[field], film)] = film
+            futures.wait(pending)
+
+        for future, film in pending.items():
+            if future.exception():
+                print(f"Failed to retrieve data for {film.filmName}: {future.exception()}")
+        return films
+
+    @staticmethod
+    def compute_average_rating(ratings:dict) -> float:
+        # histogram buckets are ordered half star to five stars, i.e. 1 to 10
+        total = sum(ratings.values())
+        if total == 0:
+            return 0
+        return (sum([key * value for key, value in enumerate(ratings.values(), start=1)]) / total).__round__(3)
+
+
+    @staticmethod
+    def scrape_film_stats(film_name:str) -> dict:
+        response = Film.session.get(f'https://letterboxd.com/film/{film_name}/members/')
+        # a throttled or failed page would otherwise parse as zeros
+        response.raise_for_status()
+        watched_response = response.text
+        watched_soup = make_soup(watched_response, 'members')
+        data = str(watched_soup.find('ul', class_="sub-nav"))
+        pattern = r'title="([\d,]+)'
+        matches = findall(pattern, data)
+        cleaned_numbers = [int(number.replace(",", "")) for number in matches]
+
+        stats = {
+            "members": cleaned_numbers[0],
+            "fans": cleaned_numbers[1],
+            "likes": cleaned_numbers[2],
+            "reviews": cleaned_numbers[3],
+            "lists": cleaned_numbers[4]
+        }
+
+        return stats
+    @staticmethod
+    def scrape_film_release_year(soup:BeautifulSoup) -> int:
+        release_year = soup.find('div', class_="releaseyear")
+        return int(release_year.find('a')['href'].split('/')[-2])
+    @staticmethod
+    def scrape_film_directors(soup:BeautifulSoup) -> list:
+        directors = soup.find('span', class_="directorlist")
+        directors_list = directors.find('a')['href'].split('/')[-2]
+        return {"Directors":directors_list}
+    @staticmethod
+    def scrape_film_synopsis(soup:BeautifulSoup) -> list:
+        synopsis = soup.find('div', class_="review body-text -prose -hero prettify").text
+        synopsis = synopsis.replace("Synopsis", "").strip()
+        return synopsis
+    @staticmethod
+    def scrape_average_rating(film_name:str) -> int:
+        response = Film.session.get(f'https://letterboxd.com/csi/film/{film_name}/rating-histogram/')
+        response.raise_for_status()
+        soup = make_soup(response.text, 'rating_histogram')
+        ratings = {}
+
+
+        rating_items = soup.select('section.ratings-histogram-chart ul li a')
+
+
+        for item in rating_items:
+    
+            title = item['title']
+            
+    
+            match = search(r'([\d,]+)\s([\S]+)\sratings\s\((\d+%)\)', title)
+            if match:
+        
+                rating_count = int(match.group(1).replace(',', ''))
+                rating_type = match.group(2)
+                
+        
+                ratings[rating_type] = rating_count
+        return ratings
+    @staticmethod
+    def scrape_film_id(soup:BeautifulSoup) -> int:
+        film_poster_div = soup.find('div', {'class': 'really-lazy-load'})
+        if film_poster_div and 'data-film-id' in film_poster_div.attrs:
+            return int(film_poster_div['data-film-id'])
+        return 0
+
+    @staticmethod
+    def scrape_film_poster(soup:BeautifulSoup, film_name:str) -> str:
+        film_poster_div = soup.find('div', {'class': 'really-lazy-load'})
+
+        # Extract the data-film-id attribute
+        if film_poster_div and 'data-film-id' in film_poster_div.attrs:
+            film_id = film_poster_div['data-film-id']
+        # template https://a.ltrbxd.com/resized/film-poster/8/3/8/1/4/0/838140-the-substance-0-1000-0-1500-crop.jpg
+        # split the id into a list
+        split_id = list(film_id)
+        # make a string like '8/3/8/1/4/0'
+        poster_path = '/'.join(split_id)
+        url = f'https://a.ltrbxd.com/resized/film-poster/{poster_path}/{film_id}-{film_name}-0-1000-0-1500-crop.jpg'
+        return url
+
+    class FilmReview:
+
+        __slots__ = ('filmName', 'filmReviews')
+
+        def __init__(self, filmName:str) -> None:
+            self.filmName: str = filmName
+            self.filmReviews: list = []
+
+        
+        def __str__(self) -> str:
+            return str(self.filmName)
+
+        def get_film_reviews(self, pages:int=1, max_reviews:int=None, since_date:date=None) -> None:
+            self.filmReviews = Film.scrape_film_reviews(film_name=self.filmName, pages=pages, max_reviews=max_reviews, since_date=since_date)
+
+        def iter_film_reviews(self, pages:int=1, max_reviews:int=None, since_date:date=None):
+            return Film.iter_film_reviews(film_name=self.filmName, pages=pages, max_reviews=max_reviews, since_date=since_date)
+            
+
+    @staticmethod
+    def scrape_film_reviews(film_name:str, pages:int=1, max_reviews:int=None, since_date:date=None, newest:bool=False) -> dict:
+        return list(Film.iter_film_reviews(film_name=film_name, pages=pages, max_reviews=max_reviews, since_date=since_date, newest=newest))
+
+    @staticmethod
+    def iter_film_reviews(film_name:str, pages:int=1, max_reviews:int=None, since_date:date=None, newest:bool=False, prefetch:int=4):
+        # pages=None reads every page the pagination on page 1 reports. since_date only makes
+        # sense newest-first, so it switches to the by/added ordering
+        order = 'by/added/' if newest or since_date else ''
+        first = Film.session.get(f'https://letterboxd.com/film/{film_name}/reviews/{order}page/1/')
+        first.raise_for_status()
+        # the path is kept film independent, parsers cache one compiled pattern per distinct path
+        last_page = Film.parser.last_page(first.text, f'reviews/{order}'.rstrip('/'))
+        if pages is not None:
+            last_page = min(pages, last_page)
+        first_reviews = Film.parse_review_page(first.text, page=1)
+        if max_reviews and first_reviews:
+            # pages hold the same number of reviews, so don't let the prefetch window run past the ones we need
+            last_page = min(last_page, -(-max_reviews // len(first_reviews)))
+
+        count = 0
+        # stopping the generator cancels the pages still waiting in the prefetch window
+        remaining = iter_ordered(lambda i: Film.process_review_page(film_name, i, order), range(2, last_page + 1), prefetch=prefetch)
+        for reviews in chain([first_reviews], remaining):
+            for review in reviews:
+                if since_date and Film.review_date(review) and Film.review_date(review) < since_date:
+                    return
+                yield review
+                count += 1
+                if max_reviews and count >= max_reviews:
+                    return
+
+    @staticmethod
+    def export_film_reviews(film_name:str, sink, pages:int=None, max_reviews:int=None, since_date:date=None, newest:bool=False) -> int:
+        # streams reviews into an export sink as pages arrive, returns the row count
+        return sink.write_many(
+            {"film": film_name, **review}
+            for review in Film.iter_film_reviews(film_name=film_name, pages=pages, max_reviews=max_reviews, since_date=since_date, newest=newest)
+        )
+
+    @staticmethod
+    def process_review_page(film_name:str, i:int, order:str='') -> list:
+        response = Film.session.get(f'https://letterboxd.com/film/{film_name}/reviews/{order}page/{i}/')
+        return Film.parse_review_page(response.text, page=i)
+
+    @staticmethod
+    def parse_review_page(text:str, page:int=None) -> list:
+        return Film.parser.review_page(text, page=page)
+
+    @staticmethod
+    def review_date(review:dict) -> date:
+        try:
+            return datetime.strptime(review['date'], '%d %b %Y').date()
+        except (KeyError, ValueError):
+            return None
+
+    @staticmethod
+    def extract_reviews(soup:BeautifulSoup) -> list:
+        return SoupParser.find_film_reviews(soup)
+
+
+FIELD_LOADERS = {'details': Film.get_film_page, 'rating': Film.get_film_rating, 'stats': Film.get_film_stats}
+
+# attributes each field group fills in, used to persist and restore films
+FIELD_ATTRIBUTES = {
+    'details': ('filmId', 'filmReleaseYear', 'filmDirectors', 'filmSynopsis', 'filmPoster'),
+    'rating': ('filmRating', 'filmAverageRating', 'filmAverageRatingOver5'),
+    'stats': ('filmStats',)
+}
@@ -0,0 +1,166 @@
+import sqlite3
+from json import dumps, loads
+from threading import Lock
+from time import time
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from .film import Film, FIELDS, FIELD_LOADERS, FIELD_ATTRIBUTES
+
+
+# seconds before a stored field group is scraped again, None never expires
+DEFAULT_MAX_AGE = {
+    'details': None,
+    'rating': 24 * 3600,
+    'stats': 24 * 3600
+}
+
+
+class FilmStore:
+
+    def __init__(self, path:str='pyboxd_films.sqlite', max_age:dict=None, max_workers:int=16) -> None:
+        self.path: str = path
+        self.maxAge: dict = {**DEFAULT_MAX_AGE, **(max_age or {})}
+        self.maxWorkers: int = max_workers
+        self.lock: Lock = Lock()
+        self.inflight: dict = {}
+        self.connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS films (slug TEXT PRIMARY KEY, film_id INTEGER)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS films_id ON films (film_id)')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS fields ('
+            'slug TEXT, field TEXT, data TEXT, fetched_at REAL, PRIMARY KEY (slug, field))'
+        )
+        self.connection.commit()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+
+    def __str__(self) -> str:
+        stats = self.stats()
+        return f'Films: {stats["films"]}\nHits: {stats["hits"]}\nMisses: {stats["misses"]}\nCoalesced: {stats["coalesced"]}'
+
+    def get(self, film_name:str, fields:tuple=FIELDS) -> Film:
+        return self.get_many([film_name], fields=fields)[0]
+
+    def get_by_id(self, film_id:int, fields:tuple=FIELDS) -> Film:
+        with self.lock:
+            row = self.connection.execute('SELECT slug FROM films WHERE film_id = ?', (film_id,)).fetchone()
+        return self.get(row[0], fields=fields) if row else None
+
+    def get_many(self, film_names:list, fields:tuple=FIELDS) -> list:
+        films = {}
+        owned = []
+        waiting = []
+        with self.lock:
+            for film_name in film_names:
+                if film_name in films:
+                    continue
+                film = films[film_name] = Film()
+                film.filmName = film_name
+                for field in fields:
+                    data = self._read(film_name, field)
+                    if data is not None:
+                        FilmStore.apply(film, field, data)
+                        self.hits += 1
+                        continue
+                    # single-flight: whoever registers first scrapes, everyone else waits on the same future
+                    future = self.inflight.get((film_name, field))
+                    if future is None:
+                        future = self.inflight[(film_name, field)] = Future()
+                        owned.append((film, field, future))
+                        self.misses += 1
+                    else:
+                        waiting.append((film, field, future))
+                        self.coalesced += 1
+
+        if owned:
+            self._scrape(owned)
+
+        for film, field, future in waiting:
+            try:
+                FilmStore.apply(film, field, future.result())
+            except Exception as e:
+                print(f"Failed to retrieve data for {film.filmName}: {e}")
+
+        return [films[film_name] for film_name in film_names]
+
+    def iter_ratings(self):
+        # (slug, filmRating, filmStats or None) for every stored film with a rating histogram, ordered by slug
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT r.slug, r.data, s.data FROM fields r LEFT JOIN fields s ON s.slug = r.slug AND s.field = 'stats' "
+                "WHERE r.field = 'rating' ORDER BY r.slug"
+            ).fetchall()
+        for slug, rating, stats in rows:
+            yield slug, loads(rating)["filmRating"], loads(stats)["filmStats"] if stats else None
+
+    def invalidate(self, film_name:str, field:str=None) -> None:
+        with self.lock:
+            if field:
+                self.connection.execute('DELETE FROM fields WHERE slug = ? AND field = ?', (film_name, field))
+            else:
+                self.connection.execute('DELETE FROM fields WHERE slug = ?', (film_name,))
+            self.connection.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            films = self.connection.execute('SELECT COUNT(*) FROM films').fetchone()[0]
+            return {"films": films, "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+    def _scrape(self, owned:list) -> None:
+        try:
+            with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+                futures = {executor.submit(FIELD_LOADERS[field], film): (film, field, future) for film, field, future in owned}
+                for done in as_completed(futures):
+                    film, field, future = futures[done]
+                    try:
+                        done.result()
+                        data = FilmStore.extract(film, field)
+                        # an empty histogram is what a throttled or broken page parses to, never store it as fresh
+                        if field != 'rating' or data['filmRating']:
+                            self._write(film.filmName, field, data)
+                        future.set_result(data)
+                    except Exception as e:
+                        print(f"Failed to retrieve data for {film.filmName}: {e}")
+                        future.set_exception(e)
+                    finally:
+                        with self.lock:
+                            self.inflight.pop((film.filmName, field), None)
+        finally:
+            # nothing may be left unresolved, other threads could be blocked on these futures
+            for film, field, future in owned:
+                if not future.done():
+                    future.set_exception(RuntimeError(f'Scrape of {film.filmName} ({field}) was interrupted'))
+                    with self.lock:
+                        self.inflight.pop((film.filmName, field), None)
+
+    def _read(self, film_name:str, field:str) -> dict:
+        row = self.connection.execute('SELECT data, fetched_at FROM fields WHERE slug = ? AND field = ?', (film_name, field)).fetchone()
+        if row is None:
+            return None
+        max_age = self.maxAge.get(field)
+        if max_age is not None and time() - row[1] > max_age:
+            return None
+        return loads(row[0])
+
+    def _write(self, film_name:str, field:str, data:dict) -> None:
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO fields VALUES (?, ?, ?, ?)', (film_name, field, dumps(data), time()))
+            if field == 'details':
+                self.connection.execute('INSERT OR REPLACE INTO films VALUES (?, ?)', (film_name, data['filmId']))
+            else:
+                self.connection.execute('INSERT OR IGNORE INTO films (slug) VALUES (?)', (film_name,))
+            self.connection.commit()
+
+    @staticmethod
+    def extract(film:Film, field:str) -> dict:
+        return {attribute: getattr(film, attribute) for attribute in FIELD_ATTRIBUTES[field]}
+
+    @staticmethod
+    def apply(film:Film, field:str, data:dict) -> None:
+        for attribute, value in data.items():
+            setattr(film, attribute, value)
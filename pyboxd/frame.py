@@ -0,0 +1,148 @@
+import numpy as np
+from array import array
+from datetime import date
+from sys import intern
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class DiaryFrame:
+    """Columnar diary: one array per field instead of one dict per entry."""
+
+    def __init__(self, user:str, dates:np.ndarray, ratings:np.ndarray, rated:np.ndarray, likes:np.ndarray, rewatches:np.ndarray,
+                 slugCodes:np.ndarray, slugs:list, reviewCodes:np.ndarray, reviews:list, length:int) -> None:
+        self.user: str = user
+        self.length: int = length
+        # datetime64[D]
+        self.dates: np.ndarray = dates
+        # 1-10 half stars, 0 where `rated` is False
+        self.ratings: np.ndarray = ratings
+        self.rated: np.ndarray = rated
+        # bit-packed, unpack with `self.liked()` / `self.rewatched()`
+        self.likes: np.ndarray = likes
+        self.rewatches: np.ndarray = rewatches
+        # dictionary-encoded strings, -1 marks a missing review
+        self.slugCodes: np.ndarray = slugCodes
+        self.slugs: list = slugs
+        self.reviewCodes: np.ndarray = reviewCodes
+        self.reviews: list = reviews
+
+    def __str__(self) -> str:
+        return f'Username: {self.user}\nEntries: {self.length}\nFilms: {len(self.slugs)}\nBytes: {self.nbytes}'
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i:int) -> dict:
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError('diary index out of range')
+        return self._entry(i, self.liked(), self.rewatched())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in (self.dates, self.ratings, self.rated, self.likes, self.rewatches, self.slugCodes, self.reviewCodes))
+
+    def liked(self) -> np.ndarray:
+        return np.unpackbits(self.likes, count=self.length).view(bool)
+
+    def rewatched(self) -> np.ndarray:
+        return np.unpackbits(self.rewatches, count=self.length).view(bool)
+
+    def to_entries(self) -> list:
+        liked, rewatched = self.liked(), self.rewatched()
+        return [self._entry(i, liked, rewatched) for i in range(self.length)]
+
+    def to_numpy(self) -> dict:
+        # dates, ratings, codes and the mask are the stored arrays, not copies
+        return {
+            "date": self.dates,
+            "rating": np.ma.MaskedArray(self.ratings, mask=~self.rated),
+            "like": self.liked(),
+            "rewatch": self.rewatched(),
+            "film_slug": self.slugCodes,
+            "review": self.reviewCodes
+        }
+
+    def to_arrow(self):
+        import pyarrow as pa
+        return pa.table({
+            "date": pa.array(self.dates),
+            "film_slug": pa.DictionaryArray.from_arrays(self.slugCodes, pa.array(self.slugs, type=pa.string())),
+            "rating": pa.array(self.ratings, mask=~self.rated),
+            "like": pa.array(self.liked()),
+            "rewatch": pa.array(self.rewatched()),
+            "review": pa.DictionaryArray.from_arrays(pa.array(self.reviewCodes, mask=self.reviewCodes < 0), pa.array(self.reviews, type=pa.string()))
+        })
+
+    def to_parquet(self, path:str, **kwargs) -> None:
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path, **kwargs)
+
+    def _entry(self, i:int, liked:np.ndarray, rewatched:np.ndarray) -> dict:
+        review = self.reviewCodes[i]
+        return {
+            "date": str(self.dates[i]).replace('-', '/'),
+            "film_slug": self.slugs[self.slugCodes[i]],
+            "rating": int(self.ratings[i]) if self.rated[i] else 'NA',
+            "like": bool(liked[i]),
+            "rewatch": bool(rewatched[i]),
+            "review": f'https://letterboxd.com{self.reviews[review]}reviews/' if review >= 0 else 'NA'
+        }
+
+    @staticmethod
+    def from_entries(entries, user:str=None) -> 'DiaryFrame':
+        # accepts any iterable of diary dicts, e.g. PyBoxd.iter_user_diary, without materializing it
+        dates = array('i')
+        ratings = array('b')
+        rated = array('b')
+        likes = array('b')
+        rewatches = array('b')
+        slugCodes = array('i')
+        reviewCodes = array('i')
+        slugIndex, slugs = {}, []
+        reviewIndex, reviews = {}, []
+
+        for entry in entries:
+            year, month, day = entry["date"].split('/')
+            dates.append(date(int(year), int(month), int(day)).toordinal() - EPOCH_ORDINAL)
+            rating = entry["rating"]
+            ratings.append(rating if rating != 'NA' else 0)
+            rated.append(rating != 'NA')
+            likes.append(entry["like"])
+            rewatches.append(entry["rewatch"])
+
+            slug = entry["film_slug"]
+            code = slugIndex.get(slug)
+            if code is None:
+                code = slugIndex[slug] = len(slugs)
+                slugs.append(intern(slug))
+            slugCodes.append(code)
+
+            review = entry["review"]
+            if review == 'NA':
+                reviewCodes.append(-1)
+            else:
+                # keep only the path, the host and trailing "reviews/" are the same for every entry
+                review = review[len('https://letterboxd.com'):-len('reviews/')]
+                code = reviewIndex.get(review)
+                if code is None:
+                    code = reviewIndex[review] = len(reviews)
+                    reviews.append(review)
+                reviewCodes.append(code)
+
+        return DiaryFrame(
+            user=user,
+            dates=np.frombuffer(dates, dtype=np.int32).astype('datetime64[D]'),
+            ratings=np.frombuffer(ratings, dtype=np.int8),
+            rated=np.frombuffer(rated, dtype=np.int8).astype(bool),
+            likes=np.packbits(np.frombuffer(likes, dtype=np.int8).astype(bool)),
+            rewatches=np.packbits(np.frombuffer(rewatches, dtype=np.int8).astype(bool)),
+            slugCodes=np.frombuffer(slugCodes, dtype=np.int32),
+            slugs=slugs,
+            reviewCodes=np.frombuffer(reviewCodes, dtype=np.int32),
+            reviews=reviews,
+            length=len(dates)
+        )
@@ -0,0 +1,152 @@
+import asyncio
+import pickle
+from array import array
+from os import replace
+from sys import intern
+from .user import PyBoxd
+
+
+UNSEEN, SCHEDULED, CRAWLED = 0, 1, 2
+
+
+class GraphCrawler:
+
+    def __init__(self, max_depth:int=2, max_nodes:int=10000, concurrency:int=8, checkpoint_path:str=None, checkpoint_every:int=100) -> None:
+        self.maxDepth: int = max_depth
+        self.maxNodes: int = max_nodes
+        self.concurrency: int = concurrency
+        self.checkpointPath: str = checkpoint_path
+        self.checkpointEvery: int = checkpoint_every
+        # usernames are interned once and referred to by integer id everywhere else
+        self.names: list = []
+        self.ids: dict = {}
+        self.depths: array = array('b')
+        self.states: bytearray = bytearray()
+        # edge i goes from sources[i] to targets[i], i.e. sources[i] follows targets[i]
+        self.sources: array = array('I')
+        self.targets: array = array('I')
+        self.scheduled: int = 0
+        self.crawled: int = 0
+        self.failed: list = []
+
+    def __str__(self) -> str:
+        return f'Nodes: {len(self.names)}\nCrawled: {self.crawled}\nScheduled: {self.scheduled}\nEdges: {len(self.sources)}'
+
+    def node_id(self, username:str) -> int:
+        node = self.ids.get(username)
+        if node is None:
+            node = self.ids[username] = len(self.names)
+            self.names.append(intern(username))
+            self.depths.append(-1)
+            self.states.append(UNSEEN)
+        return node
+
+    def crawl(self, seeds:list=None) -> None:
+        asyncio.run(self.acrawl(seeds))
+
+    async def acrawl(self, seeds:list=None) -> None:
+        queue = asyncio.Queue()
+        # resuming: everything scheduled but not crawled goes back in, shallowest first
+        pending = [node for node, state in enumerate(self.states) if state == SCHEDULED]
+        for node in sorted(pending, key=lambda node: self.depths[node]):
+            queue.put_nowait(node)
+        for username in seeds or []:
+            self._schedule(self.node_id(username), 0, queue)
+
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            if self.checkpointPath:
+                self.save(self.checkpointPath)
+
+    async def _worker(self, queue:asyncio.Queue) -> None:
+        while True:
+            node = await queue.get()
+            try:
+                await self._expand(node, queue)
+            finally:
+                queue.task_done()
+
+    async def _expand(self, node:int, queue:asyncio.Queue) -> None:
+        if self.states[node] == CRAWLED:
+            return
+        user = PyBoxd.user()
+        user.username = self.names[node]
+        try:
+            await user.aget_user_network()
+        except Exception as e:
+            # anything escaping here would end the worker and leave queue.join() waiting forever.
+            # the node stays SCHEDULED, so a resumed crawl tries it again
+            print(f"Failed to retrieve network for {user.username}: {e}")
+            if node not in self.failed:
+                self.failed.append(node)
+            return
+
+        depth = self.depths[node] + 1
+        for username in user.userNetwork["following"]:
+            other = self.node_id(username)
+            self.sources.append(node)
+            self.targets.append(other)
+            self._schedule(other, depth, queue)
+        for username in user.userNetwork["followers"]:
+            other = self.node_id(username)
+            self.sources.append(other)
+            self.targets.append(node)
+            self._schedule(other, depth, queue)
+
+        self.states[node] = CRAWLED
+        self.crawled += 1
+        if self.checkpointPath and self.crawled % self.checkpointEvery == 0:
+            self.save(self.checkpointPath)
+
+    def _schedule(self, node:int, depth:int, queue:asyncio.Queue) -> None:
+        if self.states[node] != UNSEEN or depth > self.maxDepth or self.scheduled >= self.maxNodes:
+            return
+        self.states[node] = SCHEDULED
+        self.depths[node] = depth
+        self.scheduled += 1
+        queue.put_nowait(node)
+
+    def edge_list(self) -> list:
+        return [(self.names[source], self.names[target]) for source, target in zip(self.sources, self.targets)]
+
+    def to_csr(self) -> tuple:
+        # returns (indptr, indices) over node ids, duplicate edges removed; needs numpy
+        import numpy as np
+        nodes = len(self.names)
+        keys = np.unique(np.frombuffer(self.sources, dtype=np.uint32).astype(np.uint64) * nodes + np.frombuffer(self.targets, dtype=np.uint32))
+        sources = (keys // nodes).astype(np.int64)
+        indices = (keys % nodes).astype(np.uint32)
+        indptr = np.zeros(nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=nodes), out=indptr[1:])
+        return indptr, indices
+
+    def save(self, path:str) -> None:
+        state = {
+            "names": self.names, "depths": self.depths, "states": self.states,
+            "sources": self.sources, "targets": self.targets,
+            "scheduled": self.scheduled, "crawled": self.crawled, "failed": self.failed,
+            "maxDepth": self.maxDepth, "maxNodes": self.maxNodes
+        }
+        with open(path + '.tmp', 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        replace(path + '.tmp', path)
+
+    @staticmethod
+    def load(path:str, concurrency:int=8, checkpoint_every:int=100) -> 'GraphCrawler':
+        with open(path, 'rb') as file:
+            state = pickle.load(file)
+        crawler = GraphCrawler(max_depth=state["maxDepth"], max_nodes=state["maxNodes"], concurrency=concurrency, checkpoint_path=path, checkpoint_every=checkpoint_every)
+        crawler.names = [intern(name) for name in state["names"]]
+        crawler.ids = {name: node for node, name in enumerate(crawler.names)}
+        crawler.depths = state["depths"]
+        crawler.states = state["states"]
+        crawler.sources = state["sources"]
+        crawler.targets = state["targets"]
+        crawler.scheduled = state["scheduled"]
+        crawler.crawled = state["crawled"]
+        crawler.failed = state.get("failed", [])
+        return crawler
@@ -0,0 +1,148 @@
+from re import compile
+from threading import Lock
+from time import perf_counter_ns, time_ns
+
+
+ENDPOINT_PATTERNS = [
+    (compile(r'/csi/film/[^/]+/rating-histogram/'), 'rating_histogram'),
+    (compile(r'/film/[^/]+/members/'), 'members'),
+    (compile(r'/film/[^/]+/reviews/'), 'reviews'),
+    (compile(r'/film/[^/]+/$'), 'film'),
+    (compile(r'/films/diary/'), 'diary'),
+    (compile(r'/films/'), 'films'),
+    (compile(r'/watchlist/'), 'watchlist'),
+    (compile(r'/following/'), 'following'),
+    (compile(r'/followers/'), 'followers'),
+    (compile(r'^https?://[^/]+/[^/]+/$'), 'profile'),
+]
+PAGE_PATTERN = compile(r'/page/(\d+)/')
+
+
+def endpoint_type(url:str) -> str:
+    for pattern, endpoint in ENDPOINT_PATTERNS:
+        if pattern.search(url):
+            return endpoint
+    return 'other'
+
+
+def page_number(url:str) -> int:
+    page = PAGE_PATTERN.search(url)
+    return int(page.group(1)) if page else 1
+
+
+class NullSpan:
+    # shared do-nothing span handed out while instrumentation is disabled
+
+    def __enter__(self) -> 'NullSpan':
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+
+    def __init__(self, instrumentation:'Instrumentation', phase:str, labels:dict) -> None:
+        self.instrumentation = instrumentation
+        self.phase = phase
+        self.labels = labels
+        self.start = 0
+
+    def __enter__(self) -> 'Span':
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        end = perf_counter_ns()
+        for hook in self.instrumentation.hooks:
+            hook(self.phase, self.labels, self.start, end, exc)
+        return False
+
+
+class Instrumentation:
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.hooks: list = []
+
+    def add_hook(self, hook) -> None:
+        # hook(phase, labels, start_ns, end_ns, error), called once per finished span
+        self.hooks.append(hook)
+        self.enabled = True
+
+    def remove_hook(self, hook) -> None:
+        self.hooks.remove(hook)
+        self.enabled = bool(self.hooks)
+
+    def span(self, phase:str, **labels):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, phase, labels)
+
+
+class ProfileAggregator:
+    # in-process hook: count, total and max time per (phase, endpoint)
+
+    def __init__(self) -> None:
+        self.lock: Lock = Lock()
+        self.phases: dict = {}
+
+    def __call__(self, phase:str, labels:dict, start:int, end:int, error:BaseException) -> None:
+        key = (phase, labels.get('endpoint', 'other'))
+        elapsed = end - start
+        with self.lock:
+            entry = self.phases.get(key)
+            if entry is None:
+                entry = self.phases[key] = [0, 0, 0, 0]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+            if error is not None:
+                entry[3] += 1
+
+    def __str__(self) -> str:
+        return self.summary()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.phases = {}
+
+    def stats(self) -> list:
+        with self.lock:
+            return [
+                {"phase": phase, "endpoint": endpoint, "count": count, "total_ms": (total / 1e6).__round__(3),
+                 "avg_ms": (total / count / 1e6).__round__(3), "max_ms": (peak / 1e6).__round__(3), "errors": errors}
+                for (phase, endpoint), (count, total, peak, errors) in sorted(self.phases.items(), key=lambda item: -item[1][1])
+            ]
+
+    def summary(self) -> str:
+        lines = [f'{"phase":<10}{"endpoint":<18}{"count":>8}{"total ms":>12}{"avg ms":>10}{"max ms":>10}{"errors":>8}']
+        for row in self.stats():
+            lines.append(f'{row["phase"]:<10}{row["endpoint"]:<18}{row["count"]:>8}{row["total_ms"]:>12}{row["avg_ms"]:>10}{row["max_ms"]:>10}{row["errors"]:>8}')
+        return '\n'.join(lines)
+
+
+class OpenTelemetryHook:
+    # replays finished spans into an OpenTelemetry tracer, e.g. trace.get_tracer('pyboxd')
+
+    def __init__(self, tracer) -> None:
+        self.tracer = tracer
+        # perf_counter_ns has an arbitrary origin, OpenTelemetry wants epoch nanoseconds
+        self.offset: int = time_ns() - perf_counter_ns()
+
+    def __call__(self, phase:str, labels:dict, start:int, end:int, error:BaseException) -> None:
+        span = self.tracer.start_span(f'pyboxd.{phase}', start_time=start + self.offset,
+                                      attributes={f'pyboxd.{key}': value for key, value in labels.items() if value is not None})
+        if error is not None:
+            span.record_exception(error)
+        span.end(end_time=end + self.offset)
+
+
+instrumentation = Instrumentation()
+
+
+def span(phase:str, **labels):
+    return instrumentation.span(phase, **labels)
@@ -0,0 +1,251 @@
+import sqlite3
+from argparse import ArgumentParser
+from json import dumps, loads
+from os import getpid
+from socket import gethostname
+from threading import Lock, get_ident
+from time import time, sleep
+from itertools import chain
+from .crawl import futures
+from .parsers import empty_diary_page
+from .user import PyBoxd
+
+
+KINDS = ('films', 'watchlist', 'diary', 'following', 'followers')
+PENDING, LEASED, DONE, FAILED = 'pending', 'leased', 'done', 'failed'
+
+
+class JobQueue:
+    """Durable per-page work queue: one job per (user, kind), one item per page.
+
+    Any number of threads or processes on the host can call work() on the same file.
+    Finished pages are never fetched again, so a crashed run resumes where it stopped.
+    """
+
+    def __init__(self, path:str='pyboxd_jobs.sqlite', max_attempts:int=3, lease:float=300.0, retry_delay:float=5.0, poll:float=1.0) -> None:
+        self.path: str = path
+        self.maxAttempts: int = max_attempts
+        # a leased page whose worker has not reported back after `lease` seconds is handed out again
+        self.lease: float = lease
+        self.retryDelay: float = retry_delay
+        self.poll: float = poll
+        self.lock: Lock = Lock()
+        # autocommit, transactions are opened explicitly with BEGIN IMMEDIATE
+        self.connection: sqlite3.Connection = sqlite3.connect(path, timeout=60.0, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id INTEGER PRIMARY KEY, user TEXT, kind TEXT, last_page INTEGER, created_at REAL, UNIQUE (user, kind))'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS items ('
+            'job_id INTEGER, page INTEGER, state TEXT, attempts INTEGER DEFAULT 0, available_at REAL DEFAULT 0, '
+            'leased_until REAL, owner TEXT, error TEXT, result TEXT, PRIMARY KEY (job_id, page))'
+        )
+        self.connection.execute('CREATE INDEX IF NOT EXISTS items_state ON items (state, available_at)')
+
+    def __str__(self) -> str:
+        counts = self.status()
+        return '\n'.join(f'{state.capitalize()}: {counts.get(state, 0)}' for state in (PENDING, LEASED, DONE, FAILED))
+
+    def submit(self, user:str, kind:str='films') -> int:
+        # only page 1 is queued; whoever fetches it learns the page count and queues the rest
+        if kind not in KINDS:
+            raise ValueError(f'Unknown job kind: {kind}')
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.connection.execute('INSERT OR IGNORE INTO jobs (user, kind, created_at) VALUES (?, ?, ?)', (user, kind, time()))
+                job_id = self.connection.execute('SELECT id FROM jobs WHERE user = ? AND kind = ?', (user, kind)).fetchone()[0]
+                self.connection.execute('INSERT OR IGNORE INTO items (job_id, page, state) VALUES (?, 1, ?)', (job_id, PENDING))
+                self.connection.execute('COMMIT')
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+        return job_id
+
+    def lease_item(self, owner:str) -> tuple:
+        # returns (job_id, user, kind, page) or None when nothing is ready
+        now = time()
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                # expired leases that used their last attempt are not coming back
+                self.connection.execute(
+                    'UPDATE items SET state = ?, error = ? WHERE state = ? AND leased_until < ? AND attempts >= ?',
+                    (FAILED, 'lease expired', LEASED, now, self.maxAttempts)
+                )
+                row = self.connection.execute(
+                    'SELECT items.job_id, jobs.user, jobs.kind, items.page FROM items JOIN jobs ON jobs.id = items.job_id '
+                    'WHERE (items.state = ? AND items.available_at <= ?) OR (items.state = ? AND items.leased_until < ?) '
+                    'ORDER BY items.job_id, items.page LIMIT 1',
+                    (PENDING, now, LEASED, now)
+                ).fetchone()
+                if row:
+                    self.connection.execute(
+                        'UPDATE items SET state = ?, owner = ?, leased_until = ?, attempts = attempts + 1 WHERE job_id = ? AND page = ?',
+                        (LEASED, owner, now + self.lease, row[0], row[3])
+                    )
+                self.connection.execute('COMMIT')
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+        return row
+
+    def complete(self, job_id:int, page:int, result, last_page:int=None) -> None:
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.connection.execute(
+                    'UPDATE items SET state = ?, result = ?, error = NULL, leased_until = NULL WHERE job_id = ? AND page = ?',
+                    (DONE, dumps(result), job_id, page)
+                )
+                if last_page is not None:
+                    self.connection.execute('UPDATE jobs SET last_page = ? WHERE id = ?', (last_page, job_id))
+                    self.connection.executemany(
+                        'INSERT OR IGNORE INTO items (job_id, page, state) VALUES (?, ?, ?)',
+                        [(job_id, i, PENDING) for i in range(2, last_page + 1)]
+                    )
+                self.connection.execute('COMMIT')
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+
+    def fail(self, job_id:int, page:int, error:str) -> None:
+        with self.lock:
+            attempts = self.connection.execute('SELECT attempts FROM items WHERE job_id = ? AND page = ?', (job_id, page)).fetchone()[0]
+            if attempts >= self.maxAttempts:
+                self.connection.execute(
+                    'UPDATE items SET state = ?, error = ?, leased_until = NULL WHERE job_id = ? AND page = ?',
+                    (FAILED, error, job_id, page)
+                )
+            else:
+                self.connection.execute(
+                    'UPDATE items SET state = ?, error = ?, leased_until = NULL, available_at = ? WHERE job_id = ? AND page = ?',
+                    (PENDING, error, time() + self.retryDelay * 2 ** (attempts - 1), job_id, page)
+                )
+
+    def work(self, owner:str=None, max_items:int=None, wait:bool=True) -> int:
+        # processes items until the queue is drained (or max_items), returns how many pages it finished
+        owner = owner or f'{gethostname()}:{getpid()}:{get_ident()}'
+        processed = 0
+        while max_items is None or processed < max_items:
+            item = self.lease_item(owner)
+            if item is None:
+                if wait and self.outstanding():
+                    sleep(self.poll)
+                    continue
+                return processed
+            job_id, user, kind, page = item
+            try:
+                result, last_page = JobQueue.process_item(user, kind, page)
+            except Exception as e:
+                print(f"Error fetching page {page} of {user}/{kind}: {e}")
+                self.fail(job_id, page, str(e))
+                continue
+            self.complete(job_id, page, result, last_page)
+            processed += 1
+        return processed
+
+    def run(self, user:str, kind:str='films', workers:int=8) -> list:
+        # submit, drain with `workers` threads, then assemble; None if some page ran out of attempts
+        self.submit(user, kind)
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(self.work) for _ in range(workers)]:
+                future.result()
+        return self.result(user, kind)
+
+    def outstanding(self) -> int:
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM items WHERE state IN (?, ?)', (PENDING, LEASED)).fetchone()[0]
+
+    def status(self, user:str=None, kind:str=None) -> dict:
+        query = 'SELECT items.state, COUNT(*) FROM items JOIN jobs ON jobs.id = items.job_id'
+        params = []
+        if user is not None:
+            query += ' WHERE jobs.user = ?' + (' AND jobs.kind = ?' if kind else '')
+            params = [user] + ([kind] if kind else [])
+        with self.lock:
+            return dict(self.connection.execute(query + ' GROUP BY items.state', params).fetchall())
+
+    def failures(self) -> list:
+        with self.lock:
+            return self.connection.execute(
+                'SELECT jobs.user, jobs.kind, items.page, items.attempts, items.error FROM items JOIN jobs ON jobs.id = items.job_id '
+                'WHERE items.state = ? ORDER BY items.job_id, items.page', (FAILED,)
+            ).fetchall()
+
+    def retry_failed(self) -> int:
+        # gives every failed page a fresh set of attempts
+        with self.lock:
+            return self.connection.execute(
+                'UPDATE items SET state = ?, attempts = 0, available_at = 0 WHERE state = ?', (PENDING, FAILED)
+            ).rowcount
+
+    def result(self, user:str, kind:str='films', partial:bool=False):
+        # pages in order, assembled like the matching scrape_* function; None until every page is done
+        with self.lock:
+            job = self.connection.execute('SELECT id, last_page FROM jobs WHERE user = ? AND kind = ?', (user, kind)).fetchone()
+            if job is None:
+                return None
+            rows = self.connection.execute('SELECT page, state, result FROM items WHERE job_id = ? ORDER BY page', (job[0],)).fetchall()
+        if not partial and (job[1] is None or len(rows) < job[1] or any(state != DONE for _, state, _ in rows)):
+            return None
+        pages = [loads(result) for _, state, result in rows if state == DONE]
+        if kind == 'diary':
+            diary_data = empty_diary_page()
+            for page_data in pages:
+                for key in diary_data:
+                    diary_data[key].extend(page_data[key])
+            return PyBoxd.build_diary_entries(diary_data)
+        return list(chain.from_iterable(pages))
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+    @staticmethod
+    def process_item(user:str, kind:str, page:int) -> tuple:
+        # returns (parsed page, last page number or None); raises instead of returning an empty page
+        path = 'films/diary' if kind == 'diary' else kind
+        response = PyBoxd.session.get(f'https://letterboxd.com/{user}/{path}/page/{page}/')
+        response.raise_for_status()
+        last_page = PyBoxd.parser.last_page(response.text, path) if page == 1 else None
+        if kind == 'diary':
+            return PyBoxd.parser.diary_page(response.text, page = page), last_page
+        if kind in ('following', 'followers'):
+            return PyBoxd.parser.network_page(response.text, endpoint = kind, page = page), last_page
+        return PyBoxd.parser.film_slugs(response.text, endpoint = kind, page = page), last_page
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Resumable PyBoxd crawl jobs backed by a SQLite work queue.')
+    parser.add_argument('--queue', default='pyboxd_jobs.sqlite')
+    commands = parser.add_subparsers(dest='command', required=True)
+    submit_parser = commands.add_parser('submit', help='queue one job per user')
+    submit_parser.add_argument('kind', choices=KINDS)
+    submit_parser.add_argument('users', nargs='+')
+    work_parser = commands.add_parser('work', help='process pages until the queue is empty; run several at once to share it')
+    work_parser.add_argument('--threads', type=int, default=4)
+    commands.add_parser('status', help='page counts per state and failed pages')
+    commands.add_parser('retry', help='requeue failed pages')
+
+    args = parser.parse_args()
+    queue = JobQueue(args.queue)
+    if args.command == 'submit':
+        for user in args.users:
+            queue.submit(user, args.kind)
+    elif args.command == 'work':
+        with futures.ThreadPoolExecutor(max_workers=args.threads) as executor:
+            print(f'Processed {sum(executor.map(lambda _: queue.work(), range(args.threads)))} pages')
+    elif args.command == 'retry':
+        print(f'Requeued {queue.retry_failed()} pages')
+    else:
+        print(queue)
+        for failure in queue.failures():
+            print(*failure)
+    queue.close()
+
+
+if __name__ == '__main__':
+    main()
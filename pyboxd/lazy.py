@@ -0,0 +1,22 @@
+from importlib import import_module
+
+
+class LazyModule:
+    # stands in for a module and imports it on first attribute access; import_module
+    # holds the import lock, so the first access may safely come from several threads at once
+
+    def __init__(self, name:str) -> None:
+        self.name: str = name
+        self.module = None
+
+    def __getattr__(self, attribute:str):
+        if self.module is None:
+            self.module = import_module(self.name)
+        return getattr(self.module, attribute)
+
+    def __repr__(self) -> str:
+        return f'<lazy module {self.name!r}>'
+
+
+def lazy_module(name:str) -> LazyModule:
+    return LazyModule(name)
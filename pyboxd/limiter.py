@@ -0,0 +1,80 @@
+from threading import Condition
+from time import monotonic
+
+
+class AdaptiveLimiter:
+    """AIMD limit on requests in flight, shared by every thread that fetches through a Session."""
+
+    def __init__(self, initial:int=4, minimum:int=1, maximum:int=64, backoff:float=0.5, tolerance:float=2.0, smoothing:float=0.2, baseline_smoothing:float=0.01) -> None:
+        self.limit: float = float(initial)
+        self.minimum: int = minimum
+        self.maximum: int = maximum
+        self.backoff: float = backoff
+        # a latency spike is the recent average going over `tolerance` times the long run average
+        self.tolerance: float = tolerance
+        self.smoothing: float = smoothing
+        self.baselineSmoothing: float = baseline_smoothing
+        self.condition: Condition = Condition()
+        self.inflight: int = 0
+        self.waiting: int = 0
+        self.latency: float = 0.0
+        self.baseline: float = 0.0
+        self.lastDecrease: float = 0.0
+        self.increases: int = 0
+        self.decreases: int = 0
+
+    def __str__(self) -> str:
+        stats = self.stats()
+        return f'Limit: {stats["limit"]}\nIn flight: {stats["inflight"]}\nQueued: {stats["queued"]}\nLatency: {stats["latency"]}\nBaseline: {stats["baseline"]}'
+
+    def acquire(self) -> None:
+        with self.condition:
+            self.waiting += 1
+            while self.inflight >= int(self.limit):
+                self.condition.wait()
+            self.waiting -= 1
+            self.inflight += 1
+
+    def release(self, latency:float, overloaded:bool=False) -> None:
+        # overloaded: 403/429/503, a timeout or a dropped connection
+        with self.condition:
+            saturated = self.waiting > 0 or self.inflight >= int(self.limit)
+            self.inflight -= 1
+            if overloaded:
+                self._decrease()
+            else:
+                if self.baseline == 0.0:
+                    self.latency = self.baseline = latency
+                self.latency += self.smoothing * (latency - self.latency)
+                self.baseline += self.baselineSmoothing * (latency - self.baseline)
+                if self.latency > self.tolerance * self.baseline:
+                    self._decrease()
+                elif saturated and self.limit < self.maximum:
+                    # +1 per limit's worth of successful responses, i.e. roughly one per round trip
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                    self.increases += 1
+            self.condition.notify_all()
+
+    def _decrease(self) -> None:
+        # everything already in flight reports the same congestion, so cut at most once per round trip
+        now = monotonic()
+        if now - self.lastDecrease < max(self.latency, 0.05):
+            return
+        self.lastDecrease = now
+        self.limit = max(float(self.minimum), self.limit * self.backoff)
+        self.decreases += 1
+
+    def stats(self) -> dict:
+        with self.condition:
+            return {
+                "limit": int(self.limit),
+                "inflight": self.inflight,
+                "queued": self.waiting,
+                "latency": self.latency.__round__(3),
+                "baseline": self.baseline.__round__(3),
+                "increases": self.increases,
+                "decreases": self.decreases
+            }
+
+
+default_limiter = AdaptiveLimiter()
@@ -0,0 +1,338 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from re import findall, compile, DOTALL
+from html import unescape
+from .instrument import span
+from .lazy import lazy_module
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# only the bs4 backend and the soup-based scrapers need it
+bs4 = lazy_module('bs4')
+
+
+FILM_SLUG_PATTERN = compile(r'data-film-slug="([^"]+)"')
+NETWORK_PATTERN = compile(r'href="/([A-Za-z0-9_-]+)/"')
+HREF_PATTERN = compile(r'href="([^"]+)"')
+NAME_ANCHOR_PATTERN = compile(r'<a\s[^>]*class="(?:[^"]*\s)?name(?:\s[^"]*)?"[^>]*>')
+
+# one alternation per diary field, scanned once in document order
+DIARY_PATTERN = compile(
+    r'films/diary/for/(?P<date>\d{4}/\d{2}/\d{2})/'
+    r'|data-film-slug="(?P<slug>[^"]+)"'
+    r'|<span class="(?P<rating>[^"]*)"'
+    r'|<td class="td-like center diary-like">(?P<like>.*?)</td>'
+    r'|(?P<rewatch><td class="td-rewatch center(?: icon-status-off)?">)'
+    r'|<td class="td-review center(?: [^"]*)?">(?P<review>(?s:.*?))</td>'
+)
+
+REVIEW_USER_PATTERN = compile(r'href="/(\w+)/"')
+REVIEW_RATING_CLASS_PATTERN = compile(r'rating -green \S+')
+
+# review page patterns for the fast backend, applied to one <li class="film-detail"> chunk at a time
+REVIEW_ITEM_PATTERN = compile(r'<li\s[^>]*class="(?:[^"]*\s)?film-detail(?:\s[^"]*)?"')
+REVIEW_BODY_PATTERN = compile(r'<div class="body-text -prose collapsible-text"[^>]*>.*?<p(?:\s[^>]*)?>(.*?)</p>', DOTALL)
+REVIEW_RATING_PATTERN = compile(r'<span class="rating -green \S+?"[^>]*>(.*?)</span>', DOTALL)
+REVIEW_DATE_PATTERN = compile(r'<span class="(?:[^"]*\s)?_nobr(?:\s[^"]*)?"[^>]*>(.*?)</span>', DOTALL)
+REVIEW_ID_PATTERN = compile(r'<p\s[^>]*class="(?:[^"]*\s)?like-link-target(?:\s[^"]*)?"[^>]*>')
+LIKEABLE_UID_PATTERN = compile(r'data-likeable-uid="([^"]+)"')
+TAG_PATTERN = compile(r'<[^>]*>')
+
+# profile page
+PROFILE_FIELDS = ('stats', 'favorites', 'badges', 'bio', 'avatar')
+STAT_KEYS = {'Films': 'films', 'This year': 'this_year', 'Lists': 'lists', 'Following': 'following', 'Followers': 'followers'}
+STAT_VALUE_PATTERN = compile(r'<span class="value">([\d,]+)</span>')
+STAT_DEFINITION_PATTERN = compile(r'<span class="definition">([\w\s]+)</span>')
+FAVOURITES_PATTERN = compile(r'<section\s[^>]*id="favourites"[^>]*>(.*?)</section>', DOTALL)
+PATRON_PATTERN = compile(r'<span\s[^>]*class="badge -patron"')
+PRO_PATTERN = compile(r'<span\s[^>]*class="badge -pro"')
+BIO_PATTERN = compile(r'<div class="collapsible-text body-text -small js-bio-content"[^>]*>(.*?)</div>', DOTALL)
+PARAGRAPH_PATTERN = compile(r'<p(?:\s[^>]*)?>(.*?)</p>', DOTALL)
+AVATAR_PATTERN = compile(r'<span class="avatar -a110 -large"[^>]*>(.*?)</span>', DOTALL)
+IMG_SRC_PATTERN = compile(r'<img\s+[^>]*src="([^"]+)"')
+MAX_PAGE_PATTERNS = 64
+
+
+def text_content(html:str) -> str:
+    # matches bs4 get_text(strip=True): strip each text node and glue them together
+    return ''.join(unescape(part).strip() for part in TAG_PATTERN.split(html))
+
+
+def make_soup(text:str, endpoint:str=None, page:int=None) -> BeautifulSoup:
+    with span('parse', endpoint=endpoint, page=page):
+        return bs4.BeautifulSoup(text, 'html.parser')
+
+
+def serialize(soup:BeautifulSoup, endpoint:str=None, page:int=None) -> str:
+    with span('serialize', endpoint=endpoint, page=page):
+        return str(soup)
+
+
+def profile_stats(values:list, definitions:list) -> dict:
+    stats = {key: 0 for key in STAT_KEYS.values()}
+    for definition, value in zip(definitions, values):
+        if definition in STAT_KEYS:
+            stats[STAT_KEYS[definition]] = int(value.replace(',', ''))
+    return stats
+
+
+def empty_diary_page() -> dict:
+    return {
+        "dates": [], "film_slugs": [], "ratings": [],
+        "likes": [], "rewatches": [], "reviews": []
+    }
+
+
+class SoupParser:
+    """Reference backend: parses into a bs4 html.parser tree. Slow, kept for parity checks."""
+
+    name = 'bs4'
+
+    def film_slugs(self, text:str, endpoint:str='films', page:int=None) -> list:
+        text = serialize(make_soup(text, endpoint, page), endpoint, page)
+        with span('extract', endpoint=endpoint, page=page):
+            return findall(r'data-film-slug="([^"]+)"', text)
+
+    def diary_page(self, text:str, page:int=None) -> dict:
+        soup = make_soup(text, 'diary', page)
+        # each find_* re-serializes the whole tree, that cost is part of this span
+        with span('extract', endpoint='diary', page=page):
+            return {
+                "dates": SoupParser.find_dates(soup),
+                "film_slugs": SoupParser.find_film_slugs(soup),
+                "ratings": SoupParser.find_ratings(soup),
+                "likes": SoupParser.find_likes(soup),
+                "rewatches": SoupParser.find_rewatches(soup),
+                "reviews": SoupParser.find_reviews(soup)
+            }
+
+    def network_page(self, text:str, endpoint:str='network', page:int=None) -> list:
+        soup = make_soup(text, endpoint, page)
+        with span('extract', endpoint=endpoint, page=page):
+            tags = soup.find_all('a', class_='name')
+            return [href for tag in tags for href in findall(NETWORK_PATTERN, str(tag))]
+
+    def last_page(self, text:str, path:str) -> int:
+        pages = findall(rf'{path}/page/(\d+)/', serialize(make_soup(text, path), path))
+        if len(pages) == 0:
+            pages = ['1']
+        return max([int(page) for page in pages])
+
+    def review_page(self, text:str, page:int=None) -> list:
+        soup = make_soup(text, 'reviews', page)
+        with span('extract', endpoint='reviews', page=page):
+            return SoupParser.find_film_reviews(soup)
+
+    def profile_page(self, text:str, fields:tuple=PROFILE_FIELDS) -> dict:
+        soup = make_soup(text, 'profile')
+        with span('extract', endpoint='profile'):
+            profile = {}
+            if 'stats' in fields:
+                text = str(soup)
+                profile.update(profile_stats(findall(r'<span class="value">([\d,]+)</span>', text), findall(r'<span class="definition">([\w\s]+)</span>', text)))
+            if 'favorites' in fields:
+                profile["favorites"] = findall(r'data-film-slug="([^"]+)"', str(soup.find('section', {'id': 'favourites'})))
+            if 'badges' in fields:
+                profile["patron"] = soup.find('span', class_='badge -patron') is not None
+                profile["pro"] = soup.find('span', class_='badge -pro') is not None
+            if 'bio' in fields:
+                bio = soup.find('div', class_ = "collapsible-text body-text -small js-bio-content")
+                profile["bio"] = [x.text for x in bio.find_all('p')] if bio else []
+            if 'avatar' in fields:
+                avatar = findall(r'<img\s+[^>]*src="([^"]+)"', str(soup.find('span', class_='avatar -a110 -large')))
+                profile["avatar"] = avatar[0] if avatar else None
+            return profile
+
+    @staticmethod
+    def find_film_reviews(soup:BeautifulSoup) -> list:
+        reviews_list = []
+        reviews = soup.find_all('li', class_='film-detail')
+
+        for review in reviews:
+            review_info = {}
+            # find <a class="avatar -a40" href="/(\w+)/">
+            username = REVIEW_USER_PATTERN.search(str(review))
+            if username:
+                review_info['username'] = username.group(1)
+
+
+
+            review_body = review.find('div', class_='body-text -prose collapsible-text')
+        
+            if review_body:
+                # Get the text from the first <p> inside this <div>
+                review_text_element = review_body.find('p')
+                if review_text_element:
+                    # Get the text and strip it of extra whitespace
+
+                    review_text = review_text_element.get_text(strip=True)
+                    review_info['review_text'] = review_text
+                    
+            rating_span = review.find('span', class_=REVIEW_RATING_CLASS_PATTERN)
+            if rating_span:
+                review_info['rating'] = rating_span.get_text(strip=True)
+
+            # Extract the date
+            date_span = review.find('span', class_='_nobr')
+            if date_span:   
+                review_info['date'] = date_span.get_text(strip=True)
+
+            # Extract the review_id
+            like_link_target = review.find('p', class_='like-link-target')
+            if like_link_target and 'data-likeable-uid' in like_link_target.attrs:
+                review_info['review_id'] = like_link_target['data-likeable-uid']
+
+            reviews_list.append(review_info)
+
+        return reviews_list
+
+    @staticmethod
+    def find_dates(soup:object) -> list:
+        return findall(r'films/diary/for/(\d{4}/\d{2}/\d{2})/', str(soup))
+
+    @staticmethod
+    def find_film_slugs(soup:object) -> list:
+        return findall(r'data-film-slug="([^"]+)"', str(soup))[::2]
+
+    @staticmethod
+    def find_ratings(soup:object) -> list:
+        rating_list = []
+        for rating_tag in soup.find_all('span', class_= 'rating'):
+            rating_class = rating_tag.get('class', [])
+            rated_value = next((cls.split('-')[-1] for cls in rating_class if cls.startswith('rated-')), None)
+
+            if rated_value:
+                rating_list.append(int(rated_value))
+            else:
+                rating_list.append('NA')
+        return rating_list
+
+    @staticmethod
+    def find_likes(soup:object) -> list:
+        return [True if 'icon-liked' in like else False for like in findall(r'<td class="td-like center diary-like">(.*?)</td>', str(soup))]
+
+    @staticmethod
+    def find_rewatches(soup:object) -> list:
+        return [False if 'icon-status' in rewatch else True for rewatch in findall(r'<td class="td-rewatch center( icon-status-off)?">', str(soup))]
+
+    @staticmethod
+    def find_reviews(soup:object) -> list:
+        return [
+            'https://letterboxd.com' + findall(r'href="([^"]+)"', td)[0] + 'reviews/'
+            if findall(r'href="([^"]+)"', td)
+            else 'NA'
+            for td in findall(r'<td class="td-review center(?: [^"]*)?">(.*?)</td>', str(soup), DOTALL)
+        ]
+
+
+class FastParser:
+    """Default backend: precompiled patterns run directly over the response text, no tree is built."""
+
+    name = 'fast'
+
+    def __init__(self) -> None:
+        self.pagePatterns: dict = {}
+
+    def film_slugs(self, text:str, endpoint:str='films', page:int=None) -> list:
+        with span('extract', endpoint=endpoint, page=page):
+            return FILM_SLUG_PATTERN.findall(text)
+
+    def diary_page(self, text:str, page:int=None) -> dict:
+        with span('extract', endpoint='diary', page=page):
+            return FastParser.scan_diary(text)
+
+    @staticmethod
+    def scan_diary(text:str) -> dict:
+        page = empty_diary_page()
+        slugs = []
+        for match in DIARY_PATTERN.finditer(text):
+            field = match.lastgroup
+            value = match.group(field)
+            if field == 'date':
+                page["dates"].append(value)
+            elif field == 'slug':
+                slugs.append(value)
+            elif field == 'rating':
+                classes = value.split()
+                if 'rating' not in classes:
+                    continue
+                rated_value = next((cls.split('-')[-1] for cls in classes if cls.startswith('rated-')), None)
+                page["ratings"].append(int(rated_value) if rated_value else 'NA')
+            elif field == 'like':
+                page["likes"].append('icon-liked' in value)
+            elif field == 'review':
+                href = HREF_PATTERN.search(value)
+                page["reviews"].append('https://letterboxd.com' + href.group(1) + 'reviews/' if href else 'NA')
+            else:
+                page["rewatches"].append('icon-status' not in value)
+        # every diary row carries its slug twice
+        page["film_slugs"] = slugs[::2]
+        return page
+
+    def network_page(self, text:str, endpoint:str='network', page:int=None) -> list:
+        with span('extract', endpoint=endpoint, page=page):
+            return [href for tag in NAME_ANCHOR_PATTERN.findall(text) for href in NETWORK_PATTERN.findall(tag)]
+
+    def review_page(self, text:str, page:int=None) -> list:
+        with span('extract', endpoint='reviews', page=page):
+            starts = [match.start() for match in REVIEW_ITEM_PATTERN.finditer(text)]
+            return [FastParser.scan_review(text[start:end]) for start, end in zip(starts, starts[1:] + [len(text)])]
+
+    @staticmethod
+    def scan_review(chunk:str) -> dict:
+        review_info = {}
+        username = REVIEW_USER_PATTERN.search(chunk)
+        if username:
+            review_info['username'] = username.group(1)
+        body = REVIEW_BODY_PATTERN.search(chunk)
+        if body:
+            review_info['review_text'] = text_content(body.group(1))
+        rating = REVIEW_RATING_PATTERN.search(chunk)
+        if rating:
+            review_info['rating'] = text_content(rating.group(1))
+        review_date = REVIEW_DATE_PATTERN.search(chunk)
+        if review_date:
+            review_info['date'] = text_content(review_date.group(1))
+        like_link_target = REVIEW_ID_PATTERN.search(chunk)
+        if like_link_target:
+            review_id = LIKEABLE_UID_PATTERN.search(like_link_target.group(0))
+            if review_id:
+                review_info['review_id'] = review_id.group(1)
+        return review_info
+
+    def profile_page(self, text:str, fields:tuple=PROFILE_FIELDS) -> dict:
+        with span('extract', endpoint='profile'):
+            profile = {}
+            if 'stats' in fields:
+                profile.update(profile_stats(STAT_VALUE_PATTERN.findall(text), STAT_DEFINITION_PATTERN.findall(text)))
+            if 'favorites' in fields:
+                favourites = FAVOURITES_PATTERN.search(text)
+                profile["favorites"] = FILM_SLUG_PATTERN.findall(favourites.group(1)) if favourites else []
+            if 'badges' in fields:
+                profile["patron"] = PATRON_PATTERN.search(text) is not None
+                profile["pro"] = PRO_PATTERN.search(text) is not None
+            if 'bio' in fields:
+                bio = BIO_PATTERN.search(text)
+                # same as bs4 .text: text nodes glued together, not stripped
+                profile["bio"] = [unescape(TAG_PATTERN.sub('', p)) for p in PARAGRAPH_PATTERN.findall(bio.group(1))] if bio else []
+            if 'avatar' in fields:
+                avatar = AVATAR_PATTERN.search(text)
+                avatar = IMG_SRC_PATTERN.search(avatar.group(1)) if avatar else None
+                profile["avatar"] = avatar.group(1) if avatar else None
+            return profile
+
+    def last_page(self, text:str, path:str) -> int:
+        pattern = self.pagePatterns.get(path)
+        if pattern is None:
+            # callers pass a handful of fixed paths, the cap only guards against per-item ones
+            if len(self.pagePatterns) >= MAX_PAGE_PATTERNS:
+                self.pagePatterns.clear()
+            pattern = self.pagePatterns[path] = compile(rf'{path}/page/(\d+)/')
+        pages = pattern.findall(text)
+        return max([int(page) for page in pages]) if pages else 1
+
+
+PARSERS = {SoupParser.name: SoupParser, FastParser.name: FastParser}
+
+default_parser = FastParser()
@@ -0,0 +1,119 @@
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue
+from threading import Thread, Semaphore, Event
+from .session import Session, default_session
+from .parsers import PARSERS, empty_diary_page
+
+try:
+    # Python 3.14+, one sub-interpreter per worker instead of one process
+    from concurrent.futures import InterpreterPoolExecutor
+except ImportError:
+    InterpreterPoolExecutor = None
+
+
+# per worker process, built on first use
+worker_parsers = {}
+
+EMPTY_RESULTS = {
+    'films': list, 'watchlist': list, 'following': list, 'followers': list,
+    'reviews': list, 'profile': dict, 'diary': empty_diary_page
+}
+
+
+def parse_page(kind:str, text:str, parser_name:str='fast'):
+    # runs inside the pool, so it only takes and returns plain picklable data
+    parser = worker_parsers.get(parser_name)
+    if parser is None:
+        parser = worker_parsers[parser_name] = PARSERS[parser_name]()
+    if kind == 'diary':
+        return parser.diary_page(text)
+    if kind in ('following', 'followers'):
+        return parser.network_page(text, endpoint=kind)
+    if kind == 'reviews':
+        return parser.review_page(text)
+    if kind == 'profile':
+        return parser.profile_page(text)
+    return parser.film_slugs(text, endpoint=kind)
+
+
+class Pipeline:
+
+    def __init__(self, io_workers:int=8, parse_workers:int=None, queue_size:int=32, parser:str='fast', executor:str='process') -> None:
+        self.ioWorkers: int = io_workers
+        self.queueSize: int = queue_size
+        self.parserName: str = parser
+        if executor == 'interpreter' and InterpreterPoolExecutor is not None:
+            self.executor = InterpreterPoolExecutor(max_workers=parse_workers)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=parse_workers)
+
+    def __enter__(self) -> 'Pipeline':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def map(self, kind:str, urls:list, session:Session=None):
+        # stage 1: io threads download raw text, at most `queue_size` pages ahead of the consumer
+        # stage 2: the pool parses; results are yielded in the order of `urls`
+        session = session or default_session
+        urls = list(urls)
+        work = Queue()
+        raw = Queue()
+        # one slot per page downloaded or parsing but not yet yielded; pages are taken in order,
+        # so the page due next always holds a slot and the window can never stall
+        slots = Semaphore(self.queueSize)
+        stop = Event()
+        for item in enumerate(urls):
+            work.put(item)
+        workers = min(self.ioWorkers, len(urls))
+        for _ in range(workers):
+            work.put(None)
+            Thread(target=self._download, args=(work, raw, slots, stop, session), daemon=True).start()
+
+        pending = {}
+        next_index = 0
+        try:
+            while next_index < len(urls):
+                # block only for the page that is due next, hand the pool whatever else has already arrived
+                while next_index not in pending or not raw.empty():
+                    index, text, error = raw.get()
+                    if error is not None:
+                        print(f"Error fetching page {urls[index]}: {error}")
+                        pending[index] = None
+                    else:
+                        pending[index] = self.executor.submit(parse_page, kind, text, self.parserName)
+                future = pending.pop(next_index)
+                result = future.result() if future is not None else EMPTY_RESULTS[kind]()
+                slots.release()
+                next_index += 1
+                yield result
+        finally:
+            # closing the generator early: wake the download threads so they exit instead of waiting for a slot
+            stop.set()
+            for _ in range(workers):
+                slots.release()
+            for future in pending.values():
+                if future is not None:
+                    future.cancel()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _download(work:Queue, raw:Queue, slots:Semaphore, stop:Event, session:Session) -> None:
+        while True:
+            slots.acquire()
+            if stop.is_set():
+                return
+            item = work.get()
+            if item is None:
+                return
+            index, url = item
+            try:
+                response = session.get(url)
+                response.raise_for_status()
+                raw.put((index, response.text, None))
+            except Exception as e:
+                # every index has to come back, map() blocks until the page due next arrives
+                raw.put((index, None, e))
@@ -0,0 +1,189 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from threading import Lock
+from time import monotonic, sleep
+from random import uniform
+from collections import deque
+from .instrument import instrumentation, endpoint_type, page_number
+from .lazy import lazy_module
+from .limiter import AdaptiveLimiter, default_limiter
+
+if TYPE_CHECKING:
+    from requests import Session as RequestsSession, Response
+    from .cache import ResponseCache
+
+requests = lazy_module('requests')
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# responses that mean "slow down", they shrink the adaptive limit. 403 is how Cloudflare usually answers a
+# client it has started blocking: it shrinks the limit too, but is not retried, the caller sees it straight away
+OVERLOAD_STATUSES = (403, 429, 503)
+
+
+class TokenBucket:
+
+    def __init__(self, rate:float=5.0, capacity:int=10) -> None:
+        self.rate: float = rate
+        self.capacity: int = capacity
+        self.tokens: float = capacity
+        self.updated: float = monotonic()
+        self.lock: Lock = Lock()
+
+    def acquire(self) -> None:
+        # blocks until a token is available, tokens refill at `rate` per second
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+
+class Session:
+
+    def __init__(self, rate:float=5.0, burst:int=10, retries:int=3, backoff:float=0.5, pool_size:int=32, timeout:float=30.0, cache:ResponseCache=None, limiter:AdaptiveLimiter=None) -> None:
+        self.cache: ResponseCache = cache
+        self.limiter: AdaptiveLimiter = limiter
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.timeout: float = timeout
+        self.bucket: TokenBucket = TokenBucket(rate=rate, capacity=burst) if rate else None
+        # never fewer pooled connections than requests the limiter may allow in flight, or the extra ones are
+        # thrown away after every request and need a new handshake
+        self.poolSize: int = max(pool_size, limiter.maximum) if limiter else pool_size
+        # built on the first request, so creating a Session never imports requests
+        self.httpSession: RequestsSession = None
+        self.lock: Lock = Lock()
+        self.requestCount: int = 0
+        self.retryCount: int = 0
+        self.throttledCount: int = 0
+        self.errorCount: int = 0
+        self.bytesReceived: int = 0
+        self.latencyTotal: float = 0.0
+        self.latencies: deque = deque(maxlen=10000)
+
+    def __str__(self) -> str:
+        stats = self.stats()
+        return f'Requests: {stats["requests"]}\nRetries: {stats["retries"]}\nThrottled: {stats["throttled"]}\nErrors: {stats["errors"]}\nBytes: {stats["bytes"]}\nAverage latency: {stats["avg_latency"]}'
+
+    def get(self, url:str, **kwargs) -> Response:
+        if self.cache is None:
+            return self.fetch(url, **kwargs)
+
+        cached, fresh = self.cache.lookup(url)
+        if fresh:
+            return cached
+        if cached is not None:
+            kwargs['headers'] = {**self.cache.validators(cached), **kwargs.get('headers', {})}
+
+        response = self.fetch(url, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(url)
+            return cached
+        self.cache.store(url, response)
+        return response
+
+    def fetch(self, url:str, **kwargs) -> Response:
+        # always goes to the network, bypassing the cache
+        if not instrumentation.enabled:
+            return self._fetch(url, **kwargs)
+        with instrumentation.span('fetch', endpoint=endpoint_type(url), page=page_number(url)):
+            return self._fetch(url, **kwargs)
+
+    def _fetch(self, url:str, **kwargs) -> Response:
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            if self.bucket:
+                self.bucket.acquire()
+            start = monotonic()
+            try:
+                response = self._attempt(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(monotonic() - start, 0, error=True)
+                if attempt >= self.retries:
+                    raise
+                sleep(self._delay(attempt))
+                attempt += 1
+                continue
+
+            self._record(monotonic() - start, len(response.content), throttled=response.status_code == 429)
+            if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                return response
+            sleep(self._delay(attempt, response.headers.get('Retry-After')))
+            attempt += 1
+
+    def _attempt(self, url:str, **kwargs) -> Response:
+        # one request under the adaptive limit; the slot is given back before any backoff sleep
+        if self.limiter is None:
+            return (self.httpSession or self._connect()).get(url, **kwargs)
+        self.limiter.acquire()
+        start = monotonic()
+        overloaded = True
+        try:
+            response = (self.httpSession or self._connect()).get(url, **kwargs)
+            overloaded = response.status_code in OVERLOAD_STATUSES
+            return response
+        finally:
+            self.limiter.release(monotonic() - start, overloaded=overloaded)
+
+    def stats(self) -> dict:
+        limiter = self.limiter.stats() if self.limiter else {}
+        with self.lock:
+            return {
+                "requests": self.requestCount,
+                "retries": self.retryCount,
+                "throttled": self.throttledCount,
+                "errors": self.errorCount,
+                "bytes": self.bytesReceived,
+                "latency": self.latencyTotal,
+                "avg_latency": (self.latencyTotal / self.requestCount).__round__(3) if self.requestCount else 0.0,
+                "limit": limiter.get("limit"),
+                "queued": limiter.get("queued")
+            }
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.requestCount = self.retryCount = self.throttledCount = self.errorCount = self.bytesReceived = 0
+            self.latencyTotal = 0.0
+            self.latencies.clear()
+
+    def _connect(self) -> RequestsSession:
+        with self.lock:
+            if self.httpSession is None:
+                http_session = requests.Session()
+                # one pool per host, kept alive between requests
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.poolSize)
+                http_session.mount('https://', adapter)
+                http_session.mount('http://', adapter)
+                self.httpSession = http_session
+            return self.httpSession
+
+    def _delay(self, attempt:int, retry_after:str=None) -> float:
+        with self.lock:
+            self.retryCount += 1
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        # exponential backoff with jitter so parallel workers don't retry in lockstep
+        return self.backoff * (2 ** attempt) * uniform(0.5, 1.5)
+
+    def _record(self, latency:float, size:int, throttled:bool=False, error:bool=False) -> None:
+        with self.lock:
+            self.requestCount += 1
+            self.bytesReceived += size
+            self.latencyTotal += latency
+            self.latencies.append(latency)
+            if throttled:
+                self.throttledCount += 1
+            if error:
+                self.errorCount += 1
+
+
+# PyBoxd and Film both fetch through this one, so they share one adaptive limit. The limiter decides how many
+# requests are in flight; the bucket stays as a global ceiling, set high enough that the limit can still grow
+default_session = Session(rate=20.0, burst=40, limiter=default_limiter)
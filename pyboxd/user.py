@@ -0,0 +1,622 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from re import findall
+from itertools import chain
+from .session import Session, default_session, requests
+from .crawl import Crawler, default_crawler, iter_ordered, aiter_ordered, asyncio, futures
+from .instrument import span
+from .parsers import SoupParser, FastParser, PROFILE_FIELDS, STAT_KEYS, empty_diary_page, make_soup, serialize, default_parser
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from .pipeline import Pipeline
+
+class PyBoxd():
+
+    session: Session = default_session
+    crawler: Crawler = default_crawler
+    parser: FastParser = default_parser
+    # set to a Pipeline to parse follow-up pages in worker processes instead of the fetching threads
+    pipeline: Pipeline = None
+
+    class user():
+
+        __slots__ = (
+            'username', 'films', 'thisYear', 'following', 'followers', 'favoriteFilms',
+            'mainResponse', 'mainSoup', 'filmsResponse', 'filmsSoup',
+            'networkFollowingResponse', 'networkFollowerResponse', 'networkFollowingSoup', 'networkFollowerSoup',
+            'watchedFilms', 'watchlist', 'userNetwork', 'isPatron', 'isPro', 'userLists', 'userImage', 'userBio',
+            'profileStats', 'newWatchedFilms', 'newWatchlist', 'watchedFilmsCheckpoint', 'watchlistCheckpoint', 'keepRaw',
+            'watchedFilmsSnapshot', 'watchlistSnapshot', 'watchedFilmsChanges', 'watchlistChanges'
+        )
+
+        def __init__(self, keep_raw:bool=False) -> None: 
+            self.username = None
+            self.films = 0
+            self.thisYear = 0
+            self.following = 0
+            self.followers = 0
+            self.favoriteFilms = []
+            # raw pages and soups are only kept with keep_raw=True, otherwise dropped once parsed
+            self.keepRaw = keep_raw
+            self.mainResponse = None
+            self.mainSoup = None
+            self.filmsResponse = None
+            self.filmsSoup = None
+            self.networkFollowingResponse = None
+            self.networkFollowerResponse = None
+            self.networkFollowingSoup = None
+            self.networkFollowerSoup = None
+            self.watchedFilms = []
+            self.watchlist = []
+            self.userNetwork = {}
+            self.isPatron = False
+            self.isPro = False
+            self.userLists = 0
+            self.userImage = None
+            self.userBio = []
+            self.profileStats = None
+            self.newWatchedFilms = []
+            self.newWatchlist = []
+            self.watchedFilmsCheckpoint = None
+            self.watchlistCheckpoint = None
+            self.watchedFilmsSnapshot = None
+            self.watchlistSnapshot = None
+            self.watchedFilmsChanges = []
+            self.watchlistChanges = []
+
+
+        def __str__(self):
+            userInfo = f'Username: {self.username}\nFilms: {self.films}\nThis Year:{self.thisYear}\nLists: {self.userLists}\nFollowing: {self.following}\nFollowers: {self.followers}\nFavorite Films: {self.favoriteFilms}\nPatron: {self.isPatron}\nPro: {self.isPro}'
+            return userInfo
+        
+        def set_username(self, username) -> None:
+            try:
+                response = PyBoxd.session.get(f'https://letterboxd.com/{username}/')
+                response.raise_for_status()
+                response = response.text
+            except requests.exceptions.RequestException as e:
+                print(f"Failed to retrieve data: {e}")
+                return
+            self.username = username
+            # everything the profile page offers is read in one parser pass; a tree is only built to be kept
+            profile = PyBoxd.parser.profile_page(response)
+            self.profileStats = PyBoxd.legacy_profile_stats(profile)
+            self.userBio = profile["bio"]
+            self.userImage = [profile["avatar"]] if profile["avatar"] else []
+            if self.keepRaw:
+                self.mainResponse = response
+                self.mainSoup = make_soup(response, 'profile')
+     
+        def get_profile_stats(self) -> None:
+            self.films = self.profileStats[0]['Films']
+            self.thisYear = self.profileStats[0]['This year']
+            self.following = self.profileStats[0]['Following']
+            self.followers = self.profileStats[0]['Followers']
+            self.userLists = self.profileStats[0]['Lists']   
+            self.favoriteFilms = self.profileStats[1]
+            self.isPatron = self.profileStats[2][0]
+            self.isPro = self.profileStats[2][1]
+    
+        def get_user_watched_films(self) -> None:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{self.username}/films/').text
+            self.watchedFilms = list(PyBoxd.iter_film_grid(user = self.username, page_type = 'films', text = response))
+            if self.keepRaw:
+                self.filmsResponse = response
+                self.filmsSoup = make_soup(response, 'films')
+
+        def get_user_watchlist(self) -> None:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{self.username}/watchlist/').text
+            self.watchlist = list(PyBoxd.iter_film_grid(user = self.username, page_type = 'watchlist', text = response))
+            if self.keepRaw:
+                self.filmsResponse = response
+                self.filmsSoup = make_soup(response, 'watchlist')
+
+        def get_user_network(self) -> None:
+            following = PyBoxd.session.get(f'https://letterboxd.com/{self.username}/following/').text
+            followers = PyBoxd.session.get(f'https://letterboxd.com/{self.username}/followers/').text
+            self.userNetwork = {
+                "following": PyBoxd.scrape_network_side(user = self.username, page_type = 'following', text = following),
+                "followers": PyBoxd.scrape_network_side(user = self.username, page_type = 'followers', text = followers)
+            }
+            if self.keepRaw:
+                self.networkFollowingResponse = following
+                self.networkFollowerResponse = followers
+                self.networkFollowingSoup = make_soup(following, 'following')
+                self.networkFollowerSoup = make_soup(followers, 'followers')
+
+        async def aget_user_watched_films(self) -> None:
+            self.watchedFilms = await PyBoxd.ascrape_film_grid(user = self.username, page_type = 'films')
+
+        async def aget_user_watchlist(self) -> None:
+            self.watchlist = await PyBoxd.ascrape_film_grid(user = self.username, page_type = 'watchlist')
+
+        async def aget_user_network(self) -> None:
+            self.userNetwork = await PyBoxd.ascrape_user_network(user = self.username)
+
+        def sync_user_watched_films(self, checkpoint:dict=None) -> None:
+            self.newWatchedFilms, self.watchedFilmsCheckpoint = PyBoxd.sync_film_grid(user = self.username, page_type = 'films', checkpoint = checkpoint or self.watchedFilmsCheckpoint)
+            self.watchedFilms = self.newWatchedFilms + self.watchedFilms
+
+        def sync_user_watchlist(self, checkpoint:dict=None) -> None:
+            self.newWatchlist, self.watchlistCheckpoint = PyBoxd.sync_film_grid(user = self.username, page_type = 'watchlist', checkpoint = checkpoint or self.watchlistCheckpoint)
+            self.watchlist = self.newWatchlist + self.watchlist
+
+        def diff_user_watched_films(self, snapshot:object=None, full:bool=False) -> None:
+            # add/remove events since the last snapshot, fetching only the pages needed to rebuild the list.
+            # assumes newest-first order; a swap in the middle can be missed for a few polls, full=True reconciles
+            from .changes import diff_film_grid
+            self.watchedFilmsChanges, self.watchedFilmsSnapshot, _ = diff_film_grid(user = self.username, page_type = 'films', snapshot = snapshot or self.watchedFilmsSnapshot, full = full)
+            self.watchedFilms = self.watchedFilmsSnapshot.slugs
+
+        def diff_user_watchlist(self, snapshot:object=None, full:bool=False) -> None:
+            from .changes import diff_film_grid
+            self.watchlistChanges, self.watchlistSnapshot, _ = diff_film_grid(user = self.username, page_type = 'watchlist', snapshot = snapshot or self.watchlistSnapshot, full = full)
+            self.watchlist = self.watchlistSnapshot.slugs
+
+        def get_user_bio(self) -> None:
+            # read by set_username together with the stats, only re-read when the soup was kept
+            if self.mainSoup is not None:
+                self.userBio = PyBoxd.scrapeBio(soup = self.mainSoup)
+
+        def get_user_image(self) -> None:
+            if self.mainSoup is not None:
+                self.userImage = PyBoxd.scrape_user_image(soup = self.mainSoup)
+
+    class user_diary():
+
+        __slots__ = ('user', 'userDiary', 'userDiaryResponse', 'userDiarySoup', 'newDiaryEntries', 'diaryCheckpoint', 'diaryFrame', 'keepRaw')
+        
+        def __init__(self, user:object, keep_raw:bool=False) -> None:
+            self.user = user.username
+            self.userDiary = None
+            self.keepRaw = keep_raw
+            self.userDiaryResponse = None
+            self.userDiarySoup = None
+            self.newDiaryEntries = []
+            self.diaryCheckpoint = None
+            self.diaryFrame = None
+
+        def __str__(self) -> str:
+            userDriaryInfo = f'Username: {self.user}'
+            return userDriaryInfo
+
+        def get_user_diary(self) -> None:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{self.user}/films/diary/').text
+            self.userDiary = list(PyBoxd.iter_user_diary(user = self.user, text = response))
+            if self.keepRaw:
+                self.userDiaryResponse = response
+                self.userDiarySoup = make_soup(response, 'diary')
+
+        async def aget_user_diary(self) -> None:
+            self.userDiary = await PyBoxd.ascrape_user_diary(user = self.user)
+
+        def get_user_diary_frame(self) -> None:
+            # needs numpy, streams pages straight into columns without keeping the per-entry dicts
+            from .frame import DiaryFrame
+            self.diaryFrame = DiaryFrame.from_entries(PyBoxd.iter_user_diary(user = self.user), user = self.user)
+
+        def sync_user_diary(self, checkpoint:dict=None) -> None:
+            self.newDiaryEntries, self.diaryCheckpoint = PyBoxd.sync_user_diary(user = self.user, checkpoint = checkpoint or self.diaryCheckpoint)
+            self.userDiary = self.newDiaryEntries + (self.userDiary or [])
+
+
+    @staticmethod
+    def scrape_profile_stats(soup:BeautifulSoup) -> list:
+        base_dict = {'Films': 0, 'This year': 0, 'Following': 0, 'Followers': 0, 'Lists': 0}
+        text = serialize(soup, 'profile')
+        stats = findall(r'<span class="value">([\d,]+)</span>', text)
+        defintion = findall(r'<span class="definition">([\w\s]+)</span>', text)
+        stats_dict = dict(zip(defintion, stats))
+        base_dict.update(stats_dict)
+
+        favorite_films = findall(r'data-film-slug="([^"]+)"', str(soup.find('section', {'id': 'favourites'})))
+
+        badges = []
+        badges.append([True if soup.find('span', class_='badge -patron') else False])
+        badges.append([True if soup.find('span', class_='badge -pro') else False])
+
+        return [base_dict, favorite_films, badges]
+    
+    @staticmethod
+    def legacy_profile_stats(profile:dict) -> list:
+        # profile_page record in the [stats, favorites, badges] shape scrape_profile_stats returns
+        stats = {definition: f'{profile[STAT_KEYS[definition]]:,}' for definition in ('Films', 'This year', 'Following', 'Followers', 'Lists')}
+        return [stats, profile["favorites"], [[profile["patron"]], [profile["pro"]]]]
+
+    @staticmethod
+    def fetch_profiles(usernames:list, fields:tuple=PROFILE_FIELDS, max_workers:int=16) -> tuple:
+        # returns (profiles, failures): one compact record per user that loaded, in input order,
+        # and {username: error} for the rest. Repeated usernames are fetched once
+        unknown = set(fields) - set(PROFILE_FIELDS)
+        if unknown:
+            raise ValueError(f'Unknown profile fields: {sorted(unknown)}')
+
+        usernames = list(dict.fromkeys(usernames))
+        profiles = []
+        failures = {}
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = [(username, executor.submit(PyBoxd.process_profile, username, fields)) for username in usernames]
+            for username, future in pending:
+                try:
+                    profiles.append(future.result())
+                except Exception as e:
+                    failures[username] = str(e)
+        return profiles, failures
+
+    @staticmethod
+    def process_profile(username:str, fields:tuple=PROFILE_FIELDS) -> dict:
+        response = PyBoxd.session.get(f'https://letterboxd.com/{username}/')
+        response.raise_for_status()
+        return {"username": username, **PyBoxd.parser.profile_page(response.text, fields = fields)}
+
+    @staticmethod
+    def process_page(user:str, i:int, page_type:str='films') -> list:
+        try:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{user}/{page_type}/page/{i}/')
+            response.raise_for_status()
+            return PyBoxd.parser.film_slugs(response.text, endpoint = page_type, page = i)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching page {i}: {e}")
+            return []
+    
+    @staticmethod
+    def scrape_watched_films(user: str, soup: BeautifulSoup) -> list:
+        return list(PyBoxd.iter_film_grid(user = user, page_type = 'films', text = serialize(soup, 'films')))
+    
+    @staticmethod
+    def scrape_watchlist(user:str, soup:BeautifulSoup) -> list:
+        return list(PyBoxd.iter_film_grid(user = user, page_type = 'watchlist', text = serialize(soup, 'watchlist')))
+
+    @staticmethod
+    def iter_film_grid(user:str, page_type:str='films', text:str=None, prefetch:int=8):
+        # yields slugs in page order as soon as each page is parsed
+        if text is None:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{user}/{page_type}/')
+            response.raise_for_status()
+            text = response.text
+        last_page = PyBoxd.parser.last_page(text, page_type)
+        yield from PyBoxd.parser.film_slugs(text, endpoint = page_type, page = 1)
+        if PyBoxd.pipeline:
+            pages = PyBoxd.pipeline.map(page_type, [f'https://letterboxd.com/{user}/{page_type}/page/{i}/' for i in range(2, last_page + 1)], session = PyBoxd.session)
+        else:
+            pages = iter_ordered(lambda i: PyBoxd.process_page(user, i, page_type = page_type), range(2, last_page + 1), prefetch = prefetch)
+        for film_slugs in pages:
+            yield from film_slugs
+
+    @staticmethod
+    def iter_watched_films(user:str, prefetch:int=8):
+        return PyBoxd.iter_film_grid(user = user, page_type = 'films', prefetch = prefetch)
+
+    @staticmethod
+    def iter_watchlist(user:str, prefetch:int=8):
+        return PyBoxd.iter_film_grid(user = user, page_type = 'watchlist', prefetch = prefetch)
+    
+    @staticmethod    
+    def scrape_user_network(user:str,soup:BeautifulSoup, soup2:BeautifulSoup) -> dict:
+        return {
+            "following": PyBoxd.scrape_network_side(user = user, page_type = 'following', text = serialize(soup, 'following')),
+            "followers": PyBoxd.scrape_network_side(user = user, page_type = 'followers', text = serialize(soup2, 'followers'))
+        }
+
+    @staticmethod
+    def scrape_network_side(user:str, page_type:str, text:str) -> list:
+        # `text` is page 1, already fetched by the caller
+        last_page = PyBoxd.parser.last_page(text, page_type)
+        names = PyBoxd.parser.network_page(text, endpoint = page_type, page = 1)
+        if PyBoxd.pipeline:
+            pages = PyBoxd.pipeline.map(page_type, [f'https://letterboxd.com/{user}/{page_type}/page/{i}/' for i in range(2, last_page + 1)], session = PyBoxd.session)
+        else:
+            pages = iter_ordered(lambda i: PyBoxd.process_network_page(user, i, page_type), range(2, last_page + 1))
+        for page in pages:
+            names.extend(page)
+        return names
+
+    @staticmethod
+    def process_network_page(user:str, i:int, page_type:str) -> list:
+        try:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{user}/{page_type}/page/{i}/')
+            response.raise_for_status()
+            return PyBoxd.parser.network_page(response.text, endpoint = page_type, page = i)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching page {i}: {e}")
+            return []
+
+    @staticmethod
+    def scrapeBio(soup:BeautifulSoup) -> str:
+        bio = soup.find('div', class_ = "collapsible-text body-text -small js-bio-content")
+        if bio is None:
+            return []
+        bio = bio.find_all('p')
+        bio = [x.text for x in bio]
+        return bio
+
+    @staticmethod
+    def scrape_user_image(soup:BeautifulSoup) -> list:
+        return findall(r'<img\s+[^>]*src="([^"]+)"', str(soup.find('span', class_='avatar -a110 -large')))
+
+    @staticmethod
+    def process_diary_page(user, i):
+        try:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{user}/films/diary/page/{i}/')
+            response.raise_for_status()  # Raise an error for bad status codes
+            return PyBoxd.parser.diary_page(response.text, page = i)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching page {i}: {e}")
+            return empty_diary_page()
+        
+    @staticmethod    
+    def scrape_user_diary(user:str, soup:BeautifulSoup) -> list:
+        # serialize the first page once instead of once per field
+        return list(PyBoxd.iter_user_diary(user = user, text = serialize(soup, 'diary')))
+
+    @staticmethod
+    def iter_user_diary(user:str, text:str=None, prefetch:int=8):
+        # yields diary entries newest-first, one page at a time, while later pages download
+        if text is None:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{user}/films/diary/')
+            response.raise_for_status()
+            text = response.text
+        last_page = PyBoxd.parser.last_page(text, 'films/diary')
+        yield from PyBoxd.build_diary_entries(PyBoxd.parser.diary_page(text, page = 1))
+        if PyBoxd.pipeline:
+            pages = PyBoxd.pipeline.map('diary', [f'https://letterboxd.com/{user}/films/diary/page/{i}/' for i in range(2, last_page + 1)], session = PyBoxd.session)
+        else:
+            pages = iter_ordered(lambda i: PyBoxd.process_diary_page(user, i), range(2, last_page + 1), prefetch = prefetch)
+        for page_data in pages:
+            yield from PyBoxd.build_diary_entries(page_data)
+
+    @staticmethod
+    def export_user_diary(user:str, sink, prefetch:int=8) -> int:
+        # streams diary rows into an export sink page by page, 'NA' becomes null; returns the row count
+        return sink.write_many(
+            {"user": user, **{key: (None if value == 'NA' else value) for key, value in entry.items()}}
+            for entry in PyBoxd.iter_user_diary(user = user, prefetch = prefetch)
+        )
+
+    @staticmethod
+    def export_film_grid(user:str, sink, page_type:str='films', prefetch:int=8) -> int:
+        return sink.write_many(
+            {"user": user, "list": page_type, "position": position, "film_slug": slug}
+            for position, slug in enumerate(PyBoxd.iter_film_grid(user = user, page_type = page_type, prefetch = prefetch))
+        )
+
+    @staticmethod
+    def export_user_network(user:str, sink) -> int:
+        count = 0
+        for page_type in ('following', 'followers'):
+            response = PyBoxd.session.get(f'https://letterboxd.com/{user}/{page_type}/')
+            response.raise_for_status()
+            names = PyBoxd.scrape_network_side(user = user, page_type = page_type, text = response.text)
+            count += sink.write_many({"user": user, "direction": page_type, "other": name} for name in names)
+        return count
+
+    @staticmethod
+    def build_diary_entries(diary_data:dict) -> list:
+        return [
+            {
+                "date": diary_data["dates"][j],
+                "film_slug": diary_data["film_slugs"][j],
+                "rating": diary_data["ratings"][j],
+                "like": diary_data["likes"][j],
+                "rewatch": diary_data["rewatches"][j],
+                "review": diary_data["reviews"][j]
+            }
+            for j in range(len(diary_data["film_slugs"]))
+        ]
+
+    @staticmethod
+    def find_last_page(soup:BeautifulSoup, path:str) -> int:
+        return PyBoxd.parser.last_page(serialize(soup, path), path)
+
+    @staticmethod
+    def sync_user_diary(user:str, checkpoint:dict=None, watermark:int=5) -> tuple:
+        # checkpoint holds the newest `watermark` entries seen last time: {"entries": [["2024/10/01", "slug"], ...]}.
+        # pages are newest-first, so we stop at any of them (or anything older than all of them) and return only what
+        # came before; keeping several means deleting or re-dating one of them doesn't replay its older neighbours
+        known = PyBoxd.diary_watermark(checkpoint)
+        oldest = min(date for date, _ in known) if known else None
+        new_entries = []
+        i, last_page = 1, 1
+        while i <= last_page:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{user}/films/diary/page/{i}/')
+            response.raise_for_status()
+            if i == 1:
+                last_page = PyBoxd.parser.last_page(response.text, 'films/diary')
+            for entry in PyBoxd.build_diary_entries(PyBoxd.parser.diary_page(response.text, page = i)):
+                if known and ((entry["date"], entry["film_slug"]) in known or entry["date"] < oldest):
+                    return new_entries, PyBoxd.diary_checkpoint(new_entries, checkpoint, watermark)
+                new_entries.append(entry)
+            i += 1
+        return new_entries, PyBoxd.diary_checkpoint(new_entries, checkpoint, watermark)
+
+    @staticmethod
+    def diary_watermark(checkpoint:dict=None) -> set:
+        # checkpoints from before the watermark held a single {"date", "film_slug"} entry
+        if not checkpoint:
+            return set()
+        if "entries" in checkpoint:
+            return {(date, slug) for date, slug in checkpoint["entries"]}
+        return {(checkpoint["date"], checkpoint["film_slug"])}
+
+    @staticmethod
+    def diary_checkpoint(entries:list, checkpoint:dict=None, watermark:int=5) -> dict:
+        if not entries:
+            return checkpoint
+        if checkpoint and "entries" not in checkpoint:
+            previous = [[checkpoint["date"], checkpoint["film_slug"]]]
+        else:
+            previous = checkpoint["entries"] if checkpoint else []
+        return {"entries": ([[entry["date"], entry["film_slug"]] for entry in entries] + previous)[:watermark]}
+
+    @staticmethod
+    def sync_film_grid(user:str, page_type:str='films', checkpoint:dict=None, watermark:int=5) -> tuple:
+        # checkpoint holds the newest `watermark` slugs seen last time, so one removed film doesn't force a full crawl
+        known = set(checkpoint["film_slugs"]) if checkpoint else set()
+        new_slugs = []
+        i, last_page = 1, 1
+        while i <= last_page:
+            response = PyBoxd.session.get(f'https://letterboxd.com/{user}/{page_type}/page/{i}/')
+            response.raise_for_status()
+            if i == 1:
+                last_page = PyBoxd.parser.last_page(response.text, page_type)
+            for slug in PyBoxd.parser.film_slugs(response.text, endpoint = page_type, page = i):
+                if slug in known:
+                    return new_slugs, PyBoxd.grid_checkpoint(new_slugs, checkpoint, watermark)
+                new_slugs.append(slug)
+            i += 1
+        return new_slugs, PyBoxd.grid_checkpoint(new_slugs, checkpoint, watermark)
+
+    @staticmethod
+    def grid_checkpoint(slugs:list, checkpoint:dict=None, watermark:int=5) -> dict:
+        previous = checkpoint["film_slugs"] if checkpoint else []
+        if not slugs and not previous:
+            return checkpoint
+        return {"film_slugs": (slugs + previous)[:watermark]}
+
+    @staticmethod
+    async def aprocess_page(user:str, i:int, page_type:str='films') -> list:
+        try:
+            response = await PyBoxd.crawler.fetch(f'https://letterboxd.com/{user}/{page_type}/page/{i}/', session = PyBoxd.session)
+            return PyBoxd.parser.film_slugs(response, endpoint = page_type, page = i)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching page {i}: {e}")
+            return []
+
+    @staticmethod
+    async def ascrape_film_grid(user:str, page_type:str='films') -> list:
+        response = await PyBoxd.crawler.fetch(f'https://letterboxd.com/{user}/{page_type}/', session = PyBoxd.session)
+        last_page = PyBoxd.parser.last_page(response, page_type)
+        film_slugs = [PyBoxd.parser.film_slugs(response, endpoint = page_type, page = 1)]
+        film_slugs.extend(await asyncio.gather(*[PyBoxd.aprocess_page(user, i, page_type = page_type) for i in range(2, last_page + 1)]))
+        return list(chain.from_iterable(film_slugs))
+
+    @staticmethod
+    async def aprocess_network_page(user:str, i:int, page_type:str) -> list:
+        try:
+            response = await PyBoxd.crawler.fetch(f'https://letterboxd.com/{user}/{page_type}/page/{i}/', session = PyBoxd.session)
+            return PyBoxd.parser.network_page(response, endpoint = page_type, page = i)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching page {i}: {e}")
+            return []
+
+    @staticmethod
+    async def ascrape_network_side(user:str, page_type:str) -> list:
+        response = await PyBoxd.crawler.fetch(f'https://letterboxd.com/{user}/{page_type}/', session = PyBoxd.session)
+        last_page = PyBoxd.parser.last_page(response, page_type)
+        names = [PyBoxd.parser.network_page(response, endpoint = page_type, page = 1)]
+        names.extend(await asyncio.gather(*[PyBoxd.aprocess_network_page(user, i, page_type) for i in range(2, last_page + 1)]))
+        return list(chain.from_iterable(names))
+
+    @staticmethod
+    async def ascrape_user_network(user:str) -> dict:
+        dataFollowing, dataFollowers = await asyncio.gather(
+            PyBoxd.ascrape_network_side(user, 'following'),
+            PyBoxd.ascrape_network_side(user, 'followers')
+        )
+        return {"following": dataFollowing, "followers": dataFollowers}
+
+    @staticmethod
+    async def aprocess_diary_page(user:str, i:int) -> dict:
+        try:
+            response = await PyBoxd.crawler.fetch(f'https://letterboxd.com/{user}/films/diary/page/{i}/', session = PyBoxd.session)
+            return PyBoxd.parser.diary_page(response, page = i)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching page {i}: {e}")
+            return empty_diary_page()
+
+    @staticmethod
+    async def ascrape_user_diary(user:str) -> list:
+        response = await PyBoxd.crawler.fetch(f'https://letterboxd.com/{user}/films/diary/', session = PyBoxd.session)
+        last_page = PyBoxd.parser.last_page(response, 'films/diary')
+        diary_data = PyBoxd.parser.diary_page(response, page = 1)
+        # gather keeps page order, so entries stay newest-first
+        for page_data in await asyncio.gather(*[PyBoxd.aprocess_diary_page(user, i) for i in range(2, last_page + 1)]):
+            for key in diary_data:
+                diary_data[key].extend(page_data[key])
+        return PyBoxd.build_diary_entries(diary_data)
+
+    @staticmethod
+    async def aiter_film_grid(user:str, page_type:str='films', prefetch:int=8):
+        response = await PyBoxd.crawler.fetch(f'https://letterboxd.com/{user}/{page_type}/', session = PyBoxd.session)
+        last_page = PyBoxd.parser.last_page(response, page_type)
+        for slug in PyBoxd.parser.film_slugs(response, endpoint = page_type, page = 1):
+            yield slug
+        async for film_slugs in aiter_ordered(lambda i: PyBoxd.aprocess_page(user, i, page_type = page_type), range(2, last_page + 1), prefetch = prefetch):
+            for slug in film_slugs:
+                yield slug
+
+    @staticmethod
+    async def aiter_user_diary(user:str, prefetch:int=8):
+        response = await PyBoxd.crawler.fetch(f'https://letterboxd.com/{user}/films/diary/', session = PyBoxd.session)
+        last_page = PyBoxd.parser.last_page(response, 'films/diary')
+        for entry in PyBoxd.build_diary_entries(PyBoxd.parser.diary_page(response, page = 1)):
+            yield entry
+        async for page_data in aiter_ordered(lambda i: PyBoxd.aprocess_diary_page(user, i), range(2, last_page + 1), prefetch = prefetch):
+            for entry in PyBoxd.build_diary_entries(page_data):
+                yield entry
+
+    @staticmethod
+    def find_dates(soup:object) -> list:
+        return SoupParser.find_dates(soup)
+
+    @staticmethod    
+    def find_film_slugs(soup:object) -> list:
+        return SoupParser.find_film_slugs(soup)
+
+    @staticmethod    
+    def find_ratings(soup:object) -> list:
+        return SoupParser.find_ratings(soup)
+
+    @staticmethod
+    def find_likes(soup:object) -> list:
+        return SoupParser.find_likes(soup)
+
+    @staticmethod    
+    def find_rewatches(soup:object) -> list:
+        return SoupParser.find_rewatches(soup)
+
+    @staticmethod    
+    def find_reviews(soup:object) -> list:
+        return SoupParser.find_reviews(soup)
+
+
+
+
+
+def main():
+    user = PyBoxd.user()
+    user.set_username('fer_nwn') #kurstboy
+    #user.get_profile_stats()
+    #user.get_user_watched_films()
+    #user.get_user_watchlist()
+    #user.get_user_network()
+    #user.get_user_bio()
+    print(user)
+    user.get_user_image()
+    print(user.userImage)
+    #diary = PyBoxd.user_diary(user)
+    #print(diary)
+    #import time
+    #start_time = time.time()
+    #diary.get_user_diary()
+    #end_time = time.time()
+    #print(f'Time taken to get user diary: {end_time - start_time} seconds')
+    #print(len(diary.userDiary))
+
+    #[print(diary.userDiary[_]) for _ in range(len(diary.userDiary))]
+    #print(user)
+    #print(len(user.watchedFilms))
+    #print(len(user.watchlist))
+    #print(user.userNetwork)
+    #print(user.userBio)
+
+if __name__ == '__main__':
+    main()
+
+""" 
+    Username: kurstboy
+    Time taken to get user diary: 37.64339208602905 seconds
+    1727 movies scraped
+
+"""
\ No newline at end of file
@@ -0,0 +1,99 @@
+import random
+import pytest
+from pyboxd.user import PyBoxd
+from pyboxd.changes import diff_film_grid
+
+
+PAGE_SIZE = 5
+
+
+class FakeResponse:
+
+    def __init__(self, text:str) -> None:
+        self.text = text
+        self.status_code = 200
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class FakeGrid:
+    # serves `slugs` as a paginated film grid and counts the pages asked for
+
+    def __init__(self, slugs:list) -> None:
+        self.slugs = slugs
+        self.requests = 0
+
+    def get(self, url:str, **kwargs) -> FakeResponse:
+        self.requests += 1
+        page = int(url.rstrip('/').split('/')[-1])
+        last_page = max(1, -(-len(self.slugs) // PAGE_SIZE))
+        films = ''.join(f'<div data-film-slug="{slug}"></div>' for slug in self.slugs[(page - 1) * PAGE_SIZE:page * PAGE_SIZE])
+        pagination = ''.join(f'<a href="/someone/films/page/{i}/">{i}</a>' for i in range(1, last_page + 1))
+        return FakeResponse(f'<html>{films}{pagination}</html>')
+
+
+@pytest.fixture
+def grid(monkeypatch) -> FakeGrid:
+    fake = FakeGrid([f'film-{i}' for i in range(60)])
+    monkeypatch.setattr(PyBoxd, 'session', fake)
+    return fake
+
+
+def check(events:list, old:list, new:list) -> None:
+    assert {event["film_slug"] for event in events if event["type"] == "add"} == set(new) - set(old)
+    assert {event["film_slug"] for event in events if event["type"] == "remove"} == set(old) - set(new)
+
+
+def test_unchanged_grid_is_cheap(grid):
+    _, snapshot, _ = diff_film_grid('someone', snapshot=None)
+    events, _, pages = diff_film_grid('someone', snapshot=snapshot)
+    assert events == []
+    assert pages == 3
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_adds_removals_and_moves(grid, seed):
+    # additions and moves land at the front, the way a newest-first grid changes; removals anywhere
+    rng = random.Random(seed)
+    random.seed(seed)
+    _, snapshot, full_pages = diff_film_grid('someone', snapshot=None)
+    fetched = 0
+    for poll in range(60):
+        old = list(grid.slugs)
+        for _ in range(rng.randint(0, 3)):
+            change = rng.random()
+            if change < 0.4:
+                grid.slugs.insert(0, f'new-{seed}-{poll}-{rng.random()}')
+            elif change < 0.8 and grid.slugs:
+                del grid.slugs[rng.randrange(len(grid.slugs))]
+            elif grid.slugs:
+                grid.slugs.insert(0, grid.slugs.pop(rng.randrange(len(grid.slugs))))
+        events, snapshot, pages = diff_film_grid('someone', snapshot=snapshot)
+        assert snapshot.slugs == grid.slugs
+        check(events, old, grid.slugs)
+        fetched += pages
+    # cheaper than re-crawling every page on every poll
+    assert fetched < 60 * full_pages
+
+
+def test_swap_in_the_middle(grid):
+    # same length, same first and last page: only a spot check or a full diff can see it
+    random.seed(0)
+    _, snapshot, _ = diff_film_grid('someone', snapshot=None)
+    grid.slugs[27] = 'swapped-in'
+    for _ in range(50):
+        events, snapshot, _ = diff_film_grid('someone', snapshot=snapshot)
+        if events:
+            break
+    assert snapshot.slugs == grid.slugs
+    assert {(event["type"], event["film_slug"]) for event in events} == {("remove", "film-27"), ("add", "swapped-in")}
+
+
+def test_full_reconciles(grid):
+    _, snapshot, _ = diff_film_grid('someone', snapshot=None)
+    grid.slugs[33] = 'swapped-in'
+    events, snapshot, pages = diff_film_grid('someone', snapshot=snapshot, full=True)
+    assert snapshot.slugs == grid.slugs
+    assert pages == 12
+    check(events, [f'film-{i}' for i in range(60)], grid.slugs)
@@ -0,0 +1,54 @@
+from pathlib import Path
+import pytest
+from pyboxd.parsers import SoupParser, FastParser, PROFILE_FIELDS
+
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def fixture(name:str) -> str:
+    return (FIXTURES / name).read_text(encoding='utf-8')
+
+
+@pytest.fixture(scope='module')
+def parsers() -> tuple:
+    return SoupParser(), FastParser()
+
+
+def test_diary_page(parsers):
+    soup, fast = parsers
+    text = fixture('diary.html')
+    expected = soup.diary_page(text)
+    assert len(expected["film_slugs"]) == 51
+    assert fast.diary_page(text) == expected
+
+
+def test_network_page(parsers):
+    soup, fast = parsers
+    text = fixture('network.html')
+    expected = soup.network_page(text, endpoint='following')
+    assert expected
+    assert fast.network_page(text, endpoint='following') == expected
+
+
+def test_review_page(parsers):
+    soup, fast = parsers
+    text = fixture('reviews.html')
+    expected = soup.review_page(text)
+    assert len(expected) == 12
+    assert any('rating' not in review for review in expected)
+    assert fast.review_page(text) == expected
+
+
+@pytest.mark.parametrize('fields', [PROFILE_FIELDS, ('stats',), ('bio', 'avatar')])
+def test_profile_page(parsers, fields):
+    soup, fast = parsers
+    text = fixture('profile.html')
+    assert fast.profile_page(text, fields) == soup.profile_page(text, fields)
+
+
+@pytest.mark.parametrize('name, path', [('diary.html', 'films/diary'), ('network.html', 'following'), ('reviews.html', 'reviews')])
+def test_last_page(parsers, name, path):
+    soup, fast = parsers
+    text = fixture(name)
+    assert fast.last_page(text, path) == soup.last_page(text, path) > 1